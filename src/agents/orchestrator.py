@@ -1,20 +1,192 @@
 """Orchestrator agent that coordinates the technical debt analysis workflow."""
-from typing import Dict, Any, List
-import google.generativeai as genai
+from typing import Dict, Any, List, AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple
+from dataclasses import dataclass
 from src import config
 import asyncio
-from datetime import datetime
-from src.observability.logger import get_logger, generate_correlation_id
+import bisect
+import contextvars
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from src.observability.logger import get_logger, correlation_scope
 from src.observability.tracer import trace_function, get_tracer
 from src.observability.metrics import get_global_metrics
 from src.evaluation.llm_judge import LLMJudge
 from src.evaluation.metrics import EvaluationMetrics
 from src.sessions.session_service import get_session_service, Session
 from src.memory.memory_bank import get_memory_bank
+from src.tools.git_analyzer import analyze_git_history
+from src.tools.cve_scanner import scan_dependencies_for_cves
+from src.tools.doc_parser import analyze_documentation
+from src.utils.gemini import get_model
+from src.utils.timestamps import utcnow_iso
+from src.utils.serialization import dumps_pretty, loads
 import time
 
-# Configure Gemini
-genai.configure(api_key=config.GOOGLE_API_KEY)
+
+# Static instructions come first so every impact prompt shares the same
+# prefix; only the compact JSON findings appended after it vary per run.
+_IMPACT_INSTRUCTIONS = """Analyze the business impact of the technical debt findings below.
+
+The findings are JSON with these keys:
+- git.risk: code churn risk score (0-100)
+- git.churn: number of high churn files
+- sec.n: number of vulnerable dependencies
+- sec.sev: vulnerability count per severity
+- doc.cov: documentation coverage (0-1)
+- doc.files: total source files
+
+Respond with JSON containing:
+- summary: a brief analysis of the overall business impact
+- risks: the top 3 key risks
+- recommendations: the top 3 recommendations
+"""
+_IMPACT_PROMPT_PREFIX = _IMPACT_INSTRUCTIONS + "\nFINDINGS:\n"
+
+# Fused mode asks for the narrative and its quality evaluation in one call,
+# replacing the separate LLM judge request
+_FUSED_PROMPT_PREFIX = _IMPACT_INSTRUCTIONS + """- evaluation: an assessment of your own analysis, rating each dimension 0-100:
+  completeness (covers all important aspects), accuracy (technically sound),
+  actionability (clear, implementable recommendations) and clarity
+  (well-structured and understandable), plus overall_score, strengths,
+  weaknesses and recommendations for improving the analysis
+
+FINDINGS:
+"""
+
+# Structured output schema for the impact narrative. The impact score and
+# severity are computed deterministically, so the model only supplies text.
+_IMPACT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "risks": {"type": "array", "items": {"type": "string"}},
+        "recommendations": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["summary", "risks", "recommendations"]
+}
+
+_FUSED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **_IMPACT_SCHEMA["properties"],
+        "evaluation": {
+            "type": "object",
+            "properties": {
+                "overall_score": {"type": "integer"},
+                "completeness": {"type": "integer"},
+                "accuracy": {"type": "integer"},
+                "actionability": {"type": "integer"},
+                "clarity": {"type": "integer"},
+                "strengths": {"type": "array", "items": {"type": "string"}},
+                "weaknesses": {"type": "array", "items": {"type": "string"}},
+                "recommendations": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": [
+                "overall_score", "completeness", "accuracy", "actionability",
+                "clarity", "strengths", "weaknesses", "recommendations"
+            ]
+        }
+    },
+    "required": [*_IMPACT_SCHEMA["required"], "evaluation"]
+}
+
+# Dimension keys reported by the LLM judge, in its order
+_EVALUATION_DIMENSIONS = ("completeness", "accuracy", "actionability", "clarity")
+
+
+# Impact score cut-offs: a score strictly above a threshold moves up a level
+_SEVERITY_THRESHOLDS = (30, 50, 70)
+_SEVERITY_LABELS = ("low", "medium", "high", "critical")
+
+# Below these levels a repository has no debt worth an AI narrative
+_NO_DEBT_MAX_GIT_RISK = 10
+_NO_DEBT_MIN_DOC_COVERAGE = 0.9
+
+
+async def _bounded_gather(coros: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    Await coroutines concurrently, running at most limit of them at a time.
+    
+    Like a task group, the remaining coroutines are cancelled if one fails.
+    
+    Args:
+        coros: Coroutines to run
+        limit: Maximum number running at once
+        
+    Returns:
+        Results in the same order as coros
+    """
+    sem = asyncio.Semaphore(limit)
+    
+    async def _guarded(coro):
+        async with sem:
+            return await coro
+    
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(_guarded(coro)) for coro in coros]
+    
+    return [task.result() for task in tasks]
+
+
+def _first_error(group: BaseExceptionGroup) -> BaseException:
+    """Return the first leaf exception of a (possibly nested) exception group."""
+    error: BaseException = group
+    while isinstance(error, BaseExceptionGroup):
+        error = error.exceptions[0]
+    return error
+
+
+@dataclass(slots=True, frozen=True)
+class DebtMetrics:
+    """Primitive findings extracted once from the parallel agent results."""
+    git_risk: int
+    high_churn: int
+    vulns: List[Dict[str, Any]]
+    critical_vulns: int
+    severity_summary: Dict[str, int]
+    doc_coverage: float
+    total_files: int
+    undocumented: int
+
+
+# Risk and recommendation rules depend only on a few primitive findings, so
+# results are memoized; tuples keep the shared cached values immutable
+@functools.lru_cache(maxsize=128)
+def _key_risks(git_risk: int, critical_vulns: int, doc_coverage: float) -> Tuple[str, ...]:
+    """Identify top risks from the primitive findings."""
+    risks = []
+    
+    if git_risk > 50:
+        risks.append("High code churn detected - potential stability issues")
+    
+    if critical_vulns:
+        risks.append(f"Critical security vulnerabilities found: {critical_vulns}")
+    
+    if doc_coverage < 0.5:
+        risks.append("Low documentation coverage - maintainability concern")
+    
+    return tuple(risks) if risks else ("No critical risks identified",)
+
+
+@functools.lru_cache(maxsize=128)
+def _recommendations(high_churn: int, vuln_count: int, doc_coverage: float) -> Tuple[str, ...]:
+    """Generate actionable recommendations from the primitive findings."""
+    recommendations = []
+    
+    if high_churn:
+        recommendations.append(f"Review and refactor {high_churn} high-churn files")
+    
+    if vuln_count:
+        recommendations.append(f"Update {vuln_count} vulnerable dependencies immediately")
+    
+    if doc_coverage < 0.7:
+        recommendations.append("Improve documentation coverage to at least 70%")
+    
+    return (
+        tuple(recommendations) if recommendations
+        else ("Continue maintaining current standards",)
+    )
 
 
 class TechDebtOrchestrator:
@@ -31,20 +203,25 @@ class TechDebtOrchestrator:
     def __init__(self):
         """Initialize the orchestrator with configuration and observability."""
         self.config = config.AGENT_CONFIG["orchestrator"]
-        self.correlation_id = generate_correlation_id()
-        self.logger = get_logger(__name__, self.correlation_id)
+        # Correlation IDs are per request, bound by analyze_repository
+        self.logger = get_logger(__name__)
         self.tracer = get_tracer()
         self.metrics = get_global_metrics()
         
         # Initialize Gemini model
-        self.model = genai.GenerativeModel(
-            model_name=self.config["model"],
-            generation_config={
-                "temperature": self.config["temperature"],
-                "max_output_tokens": config.MAX_TOKENS,
-            }
+        self.model = get_model(
+            self.config["model"],
+            self.config["temperature"],
+            self.config.get("max_tokens", config.MAX_TOKENS)
         )
         
+        # Bound concurrent Gemini requests to stay under the QPM quota
+        self._llm_sem = asyncio.Semaphore(config.GEMINI_CONCURRENCY)
+        
+        # Dedicated pool for the parallel tool agents, sized for batch sweeps;
+        # created on first use so orchestrators that never run tools hold no threads
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        
         # Initialize evaluation
         self.llm_judge = LLMJudge()
         
@@ -54,15 +231,35 @@ class TechDebtOrchestrator:
         
         self.logger.info(
             "orchestrator_initialized",
-            model=self.config["model"],
-            correlation_id=self.correlation_id
+            model=self.config["model"]
         )
     
+    async def __aenter__(self) -> "TechDebtOrchestrator":
+        """Use the orchestrator as an async context manager."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Release resources on exit."""
+        self.close()
+    
+    def close(self) -> None:
+        """Release the tool thread pool without waiting for running tools."""
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=False)
+            self._io_pool = None
+    
+    def __del__(self) -> None:
+        """Release the tool thread pool of an orchestrator that was never closed."""
+        # __init__ may have failed before the pool attribute was set
+        if getattr(self, "_io_pool", None) is not None:
+            self._io_pool.shutdown(wait=False)
+    
     @trace_function("analyze_repository")
     async def analyze_repository(
         self,
         repo_path: str,
-        analysis_type: str = "comprehensive"
+        analysis_type: str = "comprehensive",
+        on_narrative_chunk: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Orchestrate a complete technical debt analysis.
@@ -70,10 +267,26 @@ class TechDebtOrchestrator:
         Args:
             repo_path: Path to the repository to analyze
             analysis_type: Type of analysis
+            on_narrative_chunk: Optional callback for AI narrative text as it streams
             
         Returns:
             Dictionary containing complete analysis results
         """
+        # Each call gets its own correlation ID, so concurrent analyses on one
+        # orchestrator stay distinguishable; work handed to threads copies it
+        with correlation_scope() as correlation_id:
+            return await self._analyze_repository(
+                repo_path, analysis_type, on_narrative_chunk, correlation_id
+            )
+    
+    async def _analyze_repository(
+        self,
+        repo_path: str,
+        analysis_type: str,
+        on_narrative_chunk: Optional[Callable[[str], None]],
+        correlation_id: str
+    ) -> Dict[str, Any]:
+        """Run the analysis phases for analyze_repository."""
         analysis_start = time.time()
         
         # Create session for this analysis
@@ -89,8 +302,7 @@ class TechDebtOrchestrator:
             "analysis_started",
             repo_path=repo_path,
             analysis_type=analysis_type,
-            session_id=session.session_id,
-            correlation_id=self.correlation_id
+            session_id=session.session_id
         )
         
         try:
@@ -108,39 +320,81 @@ class TechDebtOrchestrator:
                 # Phase 2: Impact analysis
                 self.logger.info("phase_2_started", phase="impact_analysis")
                 session.update_state("current_phase", "impact_analysis")
-                impact_results = await self._analyze_impact(parallel_results)
+                debt_metrics = self._extract_metrics(parallel_results)
+                impact_results = self._compute_impact(debt_metrics)
                 self.logger.info("phase_2_completed", phase="impact_analysis")
                 
-                # Phase 3: Report generation
+                # Phases 3 and 4: report generation and evaluation run alongside
+                # the AI narrative, since the report and the judge prompt only
+                # need the deterministic impact fields. The judge uses the sync
+                # Gemini client, so it runs in a worker thread. In fused mode
+                # the narrative call also returns the evaluation.
                 self.logger.info("phase_3_started", phase="report_generation")
+                self.logger.info("evaluation_started")
                 session.update_state("current_phase", "report_generation")
-                final_report = await self._generate_report(parallel_results, impact_results)
+                evaluation_input = {
+                    "results": {
+                        "parallel_analysis": parallel_results,
+                        "impact_analysis": impact_results
+                    }
+                }
+                fuse = config.FUSE_IMPACT_AND_JUDGE
+                evaluation_task = None
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        narrative_task = tg.create_task(
+                            self._ai_narrative(
+                                debt_metrics,
+                                impact_results["severity"],
+                                on_narrative_chunk,
+                                with_evaluation=fuse
+                            )
+                        )
+                        report_task = tg.create_task(
+                            self._generate_report(parallel_results, impact_results, debt_metrics)
+                        )
+                        if not fuse:
+                            evaluation_task = tg.create_task(
+                                asyncio.to_thread(self.llm_judge.evaluate_analysis, evaluation_input)
+                            )
+                except ExceptionGroup as group:
+                    raise _first_error(group) from group
+                ai_analysis = narrative_task.result()
+                fused_evaluation = ai_analysis.pop("evaluation", None)
+                impact_results["ai_analysis"] = ai_analysis
+                final_report = report_task.result()
+                
+                if evaluation_task is not None:
+                    evaluation = evaluation_task.result()
+                elif isinstance(fused_evaluation, dict):
+                    evaluation = self._format_fused_evaluation(fused_evaluation)
+                else:
+                    # Narrative was skipped or failed, or its evaluation was
+                    # not an object; fall back to the judge
+                    evaluation = await asyncio.to_thread(
+                        self.llm_judge.evaluate_analysis, evaluation_input
+                    )
                 self.logger.info("phase_3_completed", phase="report_generation")
+                self.logger.info(
+                    "evaluation_completed",
+                    overall_score=evaluation.get("overall_score", 0)
+                )
                 
                 # Compile results
                 results = {
                     "status": "success",
                     "analysis_type": analysis_type,
                     "repo_path": repo_path,
-                    "correlation_id": self.correlation_id,
-                    "timestamp": datetime.now().isoformat(),
+                    "correlation_id": correlation_id,
+                    "timestamp": utcnow_iso(),
                     "results": {
                         "parallel_analysis": parallel_results,
                         "impact_analysis": impact_results,
                         "final_report": final_report
-                    }
+                    },
+                    "evaluation": evaluation
                 }
                 
-                # Phase 4: Evaluation (LLM-as-Judge)
-                self.logger.info("evaluation_started")
-                session.update_state("current_phase", "evaluation")
-                evaluation = self.llm_judge.evaluate_analysis(results)
-                results["evaluation"] = evaluation
-                self.logger.info(
-                    "evaluation_completed",
-                    overall_score=evaluation.get("overall_score", 0)
-                )
-                
                 # Record metrics
                 duration = time.time() - analysis_start
                 self.metrics.record_duration("full_analysis", duration)
@@ -171,8 +425,7 @@ class TechDebtOrchestrator:
                     "analysis_completed",
                     duration_seconds=duration,
                     session_id=session.session_id,
-                    memory_id=memory_id,
-                    correlation_id=self.correlation_id
+                    memory_id=memory_id
                 )
                 
                 return results
@@ -181,8 +434,7 @@ class TechDebtOrchestrator:
             self.logger.error(
                 "analysis_failed",
                 error=str(e),
-                session_id=session.session_id,
-                correlation_id=self.correlation_id
+                session_id=session.session_id
             )
             self.metrics.increment("analyses_failed")
             
@@ -194,33 +446,107 @@ class TechDebtOrchestrator:
                 "error": str(e),
                 "repo_path": repo_path,
                 "session_id": session.session_id,
-                "correlation_id": self.correlation_id,
-                "timestamp": datetime.now().isoformat()
+                "correlation_id": correlation_id,
+                "timestamp": utcnow_iso()
             }
     
+    async def analyze_repository_streaming(
+        self,
+        repo_path: str,
+        analysis_type: str = "comprehensive"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run an analysis, yielding AI narrative text as it is generated.
+        
+        Suitable for server-sent events: each chunk of raw model output is
+        yielded as an append patch to ai_analysis_text, followed by one final
+        patch with the full results. The raw text is the JSON the parsed
+        ai_analysis comes from (including the evaluation in fused mode), and
+        the final results carry the same text so both views agree.
+        
+        Args:
+            repo_path: Path to the repository to analyze
+            analysis_type: Type of analysis
+            
+        Yields:
+            {"path": "results.impact_analysis.ai_analysis_text", "append": text}
+            patches, then {"path": "", "value": results}
+        """
+        chunks: asyncio.Queue = asyncio.Queue()
+        analysis = asyncio.create_task(
+            self.analyze_repository(repo_path, analysis_type, chunks.put_nowait)
+        )
+        analysis.add_done_callback(lambda _: chunks.put_nowait(None))
+        
+        streamed = []
+        while (text := await chunks.get()) is not None:
+            streamed.append(text)
+            yield {"path": "results.impact_analysis.ai_analysis_text", "append": text}
+        
+        result = analysis.result()
+        impact_results = result.get("results", {}).get("impact_analysis")
+        if impact_results is not None:
+            impact_results["ai_analysis_text"] = "".join(streamed)
+        yield {"path": "", "value": result}
+    
+    @trace_function("analyze_repository_batch")
+    async def analyze_repository_batch(self, repo_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Collect findings and score impact for many repositories.
+        
+        Only the parallel tool agents and deterministic impact scoring run;
+        the AI narrative, evaluation and memory storage are skipped so that
+        sweeps over many repositories stay cheap.
+        
+        Args:
+            repo_paths: Paths to the repositories to analyze
+            
+        Returns:
+            One result per repository, in the same order as repo_paths
+        """
+        # Bound how many repositories are scanned at once so large sweeps
+        # don't queue hundreds of tool calls behind the shared pool
+        parallel_results_list = await _bounded_gather(
+            (self._run_parallel_agents(repo_path) for repo_path in repo_paths),
+            config.MAX_WORKERS
+        )
+        impact_results_list = self.analyze_impact_batch(parallel_results_list)
+        
+        return [
+            {
+                "repo_path": repo_path,
+                "parallel_analysis": parallel_results,
+                "impact_analysis": impact_results
+            }
+            for repo_path, parallel_results, impact_results in zip(
+                repo_paths, parallel_results_list, impact_results_list
+            )
+        ]
+    
     @trace_function("run_parallel_agents")
     async def _run_parallel_agents(self, repo_path: str) -> Dict[str, Any]:
         """Run Git, CVE, and Documentation agents in parallel."""
-        from src.tools.git_analyzer import analyze_git_history
-        from src.tools.cve_scanner import scan_dependencies_for_cves
-        from src.tools.doc_parser import analyze_documentation
-        
         with self.tracer.start_as_current_span("parallel_execution"):
-            # Create parallel tasks
-            tasks = [
-                asyncio.create_task(
-                    asyncio.to_thread(analyze_git_history, repo_path, config.GIT_LOOKBACK_DAYS)
-                ),
-                asyncio.create_task(
-                    asyncio.to_thread(scan_dependencies_for_cves, repo_path, config.NVD_API_KEY)
-                ),
-                asyncio.create_task(
-                    asyncio.to_thread(analyze_documentation, repo_path)
-                )
-            ]
+            # Run all three tools on the dedicated pool; the task group
+            # cancels the remaining tasks if any of them fails
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    git_task = tg.create_task(
+                        self._run_in_pool(analyze_git_history, repo_path, config.GIT_LOOKBACK_DAYS)
+                    )
+                    cve_task = tg.create_task(
+                        self._run_in_pool(scan_dependencies_for_cves, repo_path, config.NVD_API_KEY)
+                    )
+                    doc_task = tg.create_task(
+                        self._run_in_pool(analyze_documentation, repo_path)
+                    )
+            except ExceptionGroup as group:
+                # Surface the failing tool's own error, not the group wrapper
+                raise _first_error(group) from group
             
-            # Wait for all to complete
-            git_results, cve_results, doc_results = await asyncio.gather(*tasks)
+            git_results = git_task.result()
+            cve_results = cve_task.result()
+            doc_results = doc_task.result()
             
             # Record tool metrics
             self.metrics.increment("git_analyses_completed")
@@ -233,120 +559,196 @@ class TechDebtOrchestrator:
                 "documentation_analysis": doc_results
             }
     
-    @trace_function("analyze_impact")
-    async def _analyze_impact(self, parallel_results: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze business impact of findings using AI."""
-        git_risk = parallel_results["git_analysis"].get("risk_score", 0)
-        cve_count = len(parallel_results["cve_analysis"].get("vulnerabilities", []))
-        doc_coverage = parallel_results["documentation_analysis"].get("coverage", 0)
+    async def _run_in_pool(self, func, *args) -> Any:
+        """Run a blocking tool function on the orchestrator's I/O pool."""
+        # run_in_executor does not propagate contextvars such as the correlation ID
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(
+                max_workers=config.MAX_WORKERS, thread_name_prefix="tda-io"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._io_pool, contextvars.copy_context().run, func, *args
+        )
+    
+    def _extract_metrics(self, parallel_results: Dict[str, Any]) -> DebtMetrics:
+        """Pull the values used by impact scoring out of the agent results."""
+        git = parallel_results["git_analysis"]
+        cve = parallel_results["cve_analysis"]
+        doc = parallel_results["documentation_analysis"]
+        vulns = cve.get("vulnerabilities", [])
         
-        prompt = f"""Analyze the business impact of these technical debt findings:
-
-GIT ANALYSIS:
-- Risk Score: {git_risk}/100
-- High Churn Files: {len(parallel_results["git_analysis"].get("high_churn_files", []))}
-
-SECURITY ANALYSIS:
-- Vulnerabilities: {cve_count}
-- Severity Distribution: {parallel_results["cve_analysis"].get("severity_summary", {})}
-
-DOCUMENTATION ANALYSIS:
-- Coverage: {doc_coverage:.1%}
-- Total Files: {parallel_results["documentation_analysis"].get("total_files", 0)}
-
-Provide:
-1. Overall impact score (0-100)
-2. Severity level (low/medium/high/critical)
-3. Top 3 key risks
-4. Top 3 recommendations
-
-Format as a brief analysis."""
-
-        try:
-            response = self.model.generate_content(prompt)
-            ai_analysis = response.text
-            self.metrics.increment("ai_analyses_completed")
-        except Exception as e:
-            self.logger.error("ai_analysis_failed", error=str(e))
-            ai_analysis = "AI analysis unavailable"
-            self.metrics.increment("ai_analyses_failed")
+        return DebtMetrics(
+            git_risk=git.get("risk_score", 0),
+            high_churn=len(git.get("high_churn_files", [])),
+            vulns=vulns,
+            critical_vulns=sum(1 for v in vulns if v.get("severity") == "CRITICAL"),
+            severity_summary=cve.get("severity_summary", {}),
+            doc_coverage=doc.get("coverage", 0),
+            total_files=doc.get("total_files", 0),
+            undocumented=len(doc.get("undocumented_files", []))
+        )
+    
+    def analyze_impact_batch(
+        self,
+        parallel_results_list: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Compute deterministic impact results for many repositories at once.
+        
+        Skips the AI narrative, so scoring a large batch costs no LLM calls.
         
-        # Calculate impact score
+        Args:
+            parallel_results_list: Parallel agent results, one per repository
+            
+        Returns:
+            Impact results in the same order as the input
+        """
+        return [
+            self._compute_impact(self._extract_metrics(parallel_results))
+            for parallel_results in parallel_results_list
+        ]
+    
+    def _compute_impact(self, debt: DebtMetrics) -> Dict[str, Any]:
+        """Compute the deterministic impact score, severity, risks and recommendations."""
         impact_score = (
-            git_risk * 0.3 +
-            min(cve_count * 20, 50) * 0.4 +
-            (1 - doc_coverage) * 100 * 0.3
+            debt.git_risk * 0.3 +
+            min(len(debt.vulns) * 20, 50) * 0.4 +
+            (1 - debt.doc_coverage) * 100 * 0.3
         )
         
-        severity = "low"
-        if impact_score > 70:
-            severity = "critical"
-        elif impact_score > 50:
-            severity = "high"
-        elif impact_score > 30:
-            severity = "medium"
-        
         return {
             "impact_score": round(impact_score, 2),
-            "severity": severity,
-            "key_risks": self._identify_key_risks(parallel_results),
-            "recommendations": self._generate_recommendations(parallel_results),
-            "ai_analysis": ai_analysis
+            "severity": _SEVERITY_LABELS[bisect.bisect_left(_SEVERITY_THRESHOLDS, impact_score)],
+            "key_risks": self._identify_key_risks(debt),
+            "recommendations": self._generate_recommendations(debt)
         }
     
-    def _identify_key_risks(self, parallel_results: Dict[str, Any]) -> List[str]:
-        """Identify top risks from analysis results."""
-        risks = []
+    @trace_function("ai_narrative")
+    async def _ai_narrative(
+        self,
+        debt: DebtMetrics,
+        severity: str,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        with_evaluation: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Generate the AI business impact narrative, streaming chunks to on_chunk.
         
-        git_risk = parallel_results["git_analysis"].get("risk_score", 0)
-        if git_risk > 50:
-            risks.append("High code churn detected - potential stability issues")
+        With with_evaluation, the same request also returns a self-evaluation
+        under the "evaluation" key, replacing the separate judge call.
+        """
+        if (
+            debt.git_risk < _NO_DEBT_MAX_GIT_RISK
+            and not debt.vulns
+            and debt.doc_coverage > _NO_DEBT_MIN_DOC_COVERAGE
+        ):
+            self.metrics.increment("ai_analyses_skipped")
+            return {
+                "summary": "No significant technical debt detected; automated analysis skipped.",
+                "risks": [],
+                "recommendations": []
+            }
         
-        vulns = parallel_results["cve_analysis"].get("vulnerabilities", [])
-        critical_vulns = [v for v in vulns if v.get("severity") == "CRITICAL"]
-        if critical_vulns:
-            risks.append(f"Critical security vulnerabilities found: {len(critical_vulns)}")
+        if config.SKIP_LLM_ON_LOW and severity == "low":
+            self.metrics.increment("ai_analyses_skipped")
+            return {
+                "summary": "Low-risk repository; narrative skipped.",
+                "risks": [],
+                "recommendations": []
+            }
         
-        doc_coverage = parallel_results["documentation_analysis"].get("coverage", 0)
-        if doc_coverage < 0.5:
-            risks.append("Low documentation coverage - maintainability concern")
+        payload = {
+            "git": {"risk": debt.git_risk, "churn": debt.high_churn},
+            "sec": {"n": len(debt.vulns), "sev": debt.severity_summary},
+            "doc": {"cov": round(debt.doc_coverage, 3), "files": debt.total_files}
+        }
+        prefix, schema = (
+            (_FUSED_PROMPT_PREFIX, _FUSED_SCHEMA) if with_evaluation
+            else (_IMPACT_PROMPT_PREFIX, _IMPACT_SCHEMA)
+        )
+        prompt = prefix + json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+        try:
+            async with self._llm_sem:
+                async with asyncio.timeout(config.LLM_TIMEOUT):
+                    response = await self.model.generate_content_async(
+                        prompt,
+                        generation_config={
+                            "response_mime_type": "application/json",
+                            "response_schema": schema
+                        },
+                        stream=True
+                    )
+                    chunks = []
+                    async for chunk in response:
+                        chunks.append(chunk.text)
+                        if on_chunk:
+                            on_chunk(chunk.text)
+            ai_analysis = loads("".join(chunks))
+            if not isinstance(ai_analysis, dict):
+                raise ValueError(
+                    f"expected a JSON object, got {type(ai_analysis).__name__}"
+                )
+            self.metrics.increment("ai_analyses_completed")
+        except Exception as e:
+            self.logger.error("ai_analysis_failed", error=str(e))
+            ai_analysis = {
+                "summary": "AI analysis unavailable",
+                "risks": [],
+                "recommendations": []
+            }
+            self.metrics.increment("ai_analyses_failed")
         
-        return risks if risks else ["No critical risks identified"]
+        return ai_analysis
     
-    def _generate_recommendations(self, parallel_results: Dict[str, Any]) -> List[str]:
-        """Generate actionable recommendations."""
-        recommendations = []
-        
-        high_churn_files = parallel_results["git_analysis"].get("high_churn_files", [])
-        if high_churn_files:
-            recommendations.append(f"Review and refactor {len(high_churn_files)} high-churn files")
-        
-        vulns = parallel_results["cve_analysis"].get("vulnerabilities", [])
-        if vulns:
-            recommendations.append(f"Update {len(vulns)} vulnerable dependencies immediately")
+    def _format_fused_evaluation(self, fused: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Shape a fused self-evaluation like an LLMJudge evaluation.
         
-        doc_coverage = parallel_results["documentation_analysis"].get("coverage", 0)
-        if doc_coverage < 0.7:
-            recommendations.append("Improve documentation coverage to at least 70%")
+        Missing fields (for example from a truncated reply) default the same
+        way the judge's parser does, rather than raising.
+        """
+        dimension_scores = {
+            name: fused[name] for name in _EVALUATION_DIMENSIONS if name in fused
+        }
+        overall_score = fused.get("overall_score", 0)
+        if overall_score == 0 and dimension_scores:
+            overall_score = int(sum(dimension_scores.values()) / len(dimension_scores))
         
-        return recommendations if recommendations else ["Continue maintaining current standards"]
+        return {
+            "overall_score": overall_score,
+            "dimension_scores": dimension_scores,
+            "strengths": fused.get("strengths", []),
+            "weaknesses": fused.get("weaknesses", []),
+            "recommendations": fused.get("recommendations", []),
+            "evaluated_at": utcnow_iso(),
+            "judge_model": self.config["model"]
+        }
+    
+    def _identify_key_risks(self, debt: DebtMetrics) -> List[str]:
+        """Identify top risks from analysis results."""
+        return list(_key_risks(debt.git_risk, debt.critical_vulns, debt.doc_coverage))
+    
+    def _generate_recommendations(self, debt: DebtMetrics) -> List[str]:
+        """Generate actionable recommendations."""
+        return list(
+            _recommendations(debt.high_churn, len(debt.vulns), debt.doc_coverage)
+        )
     
     @trace_function("generate_report")
     async def _generate_report(
         self,
         parallel_results: Dict[str, Any],
-        impact_results: Dict[str, Any]
+        impact_results: Dict[str, Any],
+        debt: DebtMetrics
     ) -> Dict[str, Any]:
         """Generate final comprehensive report."""
         return {
             "executive_summary": {
                 "impact_score": impact_results["impact_score"],
                 "severity": impact_results["severity"],
-                "total_issues": (
-                    len(parallel_results["git_analysis"].get("high_churn_files", [])) +
-                    len(parallel_results["cve_analysis"].get("vulnerabilities", [])) +
-                    len(parallel_results["documentation_analysis"].get("undocumented_files", []))
-                )
+                "total_issues": debt.high_churn + len(debt.vulns) + debt.undocumented
             },
             "detailed_findings": {
                 "git_analysis": parallel_results["git_analysis"],
@@ -361,11 +763,10 @@ Format as a brief analysis."""
 # For testing
 if __name__ == "__main__":
     async def test():
-        orchestrator = TechDebtOrchestrator()
-        result = await orchestrator.analyze_repository(".", "comprehensive")
+        async with TechDebtOrchestrator() as orchestrator:
+            result = await orchestrator.analyze_repository(".", "comprehensive")
         
-        import json
-        print(json.dumps(result, indent=2, default=str))
+        print(dumps_pretty(result))
     
     import logging
     logging.basicConfig(level=logging.INFO)
@@ -1,6 +1,7 @@
 """Configuration settings for Code Archaeologist AI Agent."""
 import os
 from pathlib import Path
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -9,16 +10,30 @@ load_dotenv()
 # API Keys
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 NVD_API_KEY = os.getenv("NVD_API_KEY", "")
+if NVD_API_KEY.startswith("your_"):
+    NVD_API_KEY = ""  # .env.example placeholder; skip NVD lookups
 
 # Gemini Model Configuration
 GEMINI_MODEL = "gemini-2.5-flash-lite"
 TEMPERATURE = 0.7
-MAX_TOKENS = 8000
+MAX_TOKENS = 8000  # Fallback when an agent has no max_tokens cap
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "4"))
+LLM_TIMEOUT = 30  # seconds
+# Client-side pacing for judge requests (Gemini quota per minute)
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "15"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "250000"))
+# Skip the AI impact narrative for low-severity repositories
+SKIP_LLM_ON_LOW = os.getenv("SKIP_LLM_ON_LOW", "false").lower() == "true"
+# Have the impact narrative call self-evaluate instead of a separate judge call
+FUSE_IMPACT_AND_JUDGE = os.getenv("FUSE_IMPACT_AND_JUDGE", "false").lower() == "true"
 
 # Project Settings
 PROJECT_ROOT = Path(__file__).parent.parent
 REPORTS_DIR = PROJECT_ROOT / "reports"
 EXAMPLES_DIR = PROJECT_ROOT / "examples"
+CACHE_DIR = Path(os.getenv("CODE_ARCHAEOLOGIST_CACHE", "~/.cache/code_archaeologist")).expanduser()
+# Reuse per-file documentation counts across runs (stored under CACHE_DIR)
+DOC_PARSER_CACHE = os.getenv("DOC_PARSER_CACHE", "true").lower() == "true"
 
 # Agent Configuration
 MAX_WORKERS = int(os.getenv("MAX_WORKERS", "6"))
@@ -27,19 +42,26 @@ AGENT_TIMEOUT = 300  # seconds
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 ENABLE_TRACING = os.getenv("ENABLE_TRACING", "true").lower() == "true"
+# Share of request traces recorded (0.0-1.0) when tracing is enabled
+TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "0.1"))
+# Print finished spans to the console (development only)
+DEBUG_TRACING = os.getenv("DEBUG_TRACING", "false").lower() == "true"
 
 # Tool Configuration
 GIT_LOOKBACK_DAYS = 90
 CVE_SEVERITY_THRESHOLD = "MEDIUM"
 DOC_COVERAGE_THRESHOLD = 0.6
 
-# Agent-specific configurations
-AGENT_CONFIG = {
+# Agent-specific configurations (read-only; agents share these mappings)
+_AGENT_CONFIG = {
     "orchestrator": {
         "name": "Code Archaeologist Orchestrator",
         "description": "Coordinates technical debt analysis across multiple agents",
         "model": GEMINI_MODEL,
         "temperature": 0.3,  # Lower for more deterministic coordination
+        # A fused reply carries the judge's evaluation (capped at 800 below)
+        # on top of the narrative, so it needs room for both
+        "max_tokens": 2048 if FUSE_IMPACT_AND_JUDGE else 1024,
     },
     "git_history": {
         "name": "Git History Analyzer",
@@ -71,7 +93,17 @@ AGENT_CONFIG = {
         "model": GEMINI_MODEL,
         "temperature": 0.8,  # Higher for more creative reporting
     },
+    "llm_judge": {
+        "name": "LLM Judge",
+        "description": "Evaluates the quality of technical debt analyses",
+        "model": GEMINI_MODEL,
+        "temperature": 0.3,  # Lower for more consistent judging
+        "max_tokens": 800,
+    },
 }
+AGENT_CONFIG = MappingProxyType({
+    agent: MappingProxyType(settings) for agent, settings in _AGENT_CONFIG.items()
+})
 
 # Ensure directories exist
 REPORTS_DIR.mkdir(exist_ok=True)
@@ -1,8 +1,104 @@
 """LLM-as-Judge evaluation framework for assessing analysis quality."""
-import google.generativeai as genai
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, Optional
+from pathlib import Path
+import hashlib
+import os
+import re
+import string
+import time
 from src import config
+from src.utils.gemini import get_model
+from src.utils.serialization import dumps_compact, loads
+from src.utils.timestamps import utcnow_iso
+from src.evaluation.rate_limiter import TokenBucket, estimate_tokens, get_rate_limiter
+
+_JUDGE_CONFIG = config.AGENT_CONFIG["llm_judge"]
+_JUDGE_MODEL = _JUDGE_CONFIG["model"]
+_JUDGE_TEMPERATURE = _JUDGE_CONFIG["temperature"]
+_JUDGE_MAX_TOKENS = _JUDGE_CONFIG.get("max_tokens", config.MAX_TOKENS)
+
+# Cached evaluations older than this are treated as misses
+_CACHE_TTL = 7 * 24 * 3600  # seconds
+_CACHE_POLICIES = ("enabled", "read_only", "replay", "disabled")
+
+# Judge response fields, matched in a single scan of the response text
+_SCORE_RE = re.compile(
+    r"^\s*(OVERALL_SCORE|COMPLETENESS|ACCURACY|ACTIONABILITY|CLARITY):[ \t]*(\d+)", re.M
+)
+# List sections: "- " items, with blank lines allowed before and between them
+_SECTION_RE = re.compile(
+    r"^\s*(STRENGTHS|WEAKNESSES|RECOMMENDATIONS):[ \t]*\n"
+    r"((?:[ \t]*\n|[ \t]*- .+(?:\n|\Z))+)",
+    re.M
+)
+
+# Batched tool evaluations: one "### name" block of scores per tool
+_TOOL_HEADER_RE = re.compile(r"^[ \t]*###[ \t]*(.+?)[ \t]*$", re.M)
+_TOOL_SCORE_RE = re.compile(
+    r"^\s*(COMPLETENESS|ACCURACY|USEFULNESS|OVERALL):[ \t]*(\d+)", re.M
+)
+
+# Static judge instructions. Every evaluation prompt starts with this exact
+# text and only the analysis results appended after it vary, so the shared
+# prefix can be served from Gemini's prefix cache.
+_JUDGE_PROMPT_PREFIX = """You are an expert code quality auditor evaluating a technical debt analysis report.
+
+EVALUATION CRITERIA:
+Rate each dimension on a scale of 0-100:
+
+1. COMPLETENESS (0-100): Does the analysis cover all important aspects?
+2. ACCURACY (0-100): Are the findings technically sound and precise?
+3. ACTIONABILITY (0-100): Are recommendations clear and implementable?
+4. CLARITY (0-100): Is the report well-structured and understandable?
+
+Provide your evaluation in this EXACT format:
+
+OVERALL_SCORE: [0-100]
+
+COMPLETENESS: [0-100]
+ACCURACY: [0-100]
+ACTIONABILITY: [0-100]
+CLARITY: [0-100]
+
+STRENGTHS:
+- [strength 1]
+- [strength 2]
+- [strength 3]
+
+WEAKNESSES:
+- [weakness 1]
+- [weakness 2]
+
+RECOMMENDATIONS:
+- [recommendation 1]
+- [recommendation 2]
+
+ANALYSIS RESULTS TO EVALUATE:
+
+"""
+
+# Per-run findings appended after the static prefix
+_JUDGE_RESULTS_TEMPLATE = string.Template("""Git History Analysis:
+- Risk Score: $risk_score/100
+- Total Commits: $total_commits
+- High Churn Files: $churn_count
+
+Security Analysis:
+- Total Dependencies: $total_dependencies
+- Vulnerabilities Found: $vuln_count
+- Severity Distribution: $severity_summary
+
+Documentation Analysis:
+- Coverage: $coverage
+- Total Files: $total_files
+- Documented Files: $documented_files
+
+Impact Assessment:
+- Impact Score: $impact_score/100
+- Severity: $severity
+- Key Risks: $key_risks
+- Recommendations: $recommendations
+""")
 
 
 class LLMJudge:
@@ -16,35 +112,64 @@ class LLMJudge:
     - Clarity
     """
     
-    def __init__(self):
-        """Initialize LLM judge with Gemini model."""
-        genai.configure(api_key=config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(
-            model_name="gemini-2.5-flash-lite",
-            generation_config={
-                "temperature": 0.3,  # Lower for more consistent judging
-                "max_output_tokens": 2000,
-            }
-        )
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        rate_limiter: Optional[TokenBucket] = None
+    ):
+        """
+        Initialize LLM judge with Gemini model.
+        
+        Args:
+            cache_dir: Directory for cached evaluations (defaults to the user cache)
+            rate_limiter: Bucket pacing Gemini requests (defaults to the shared one)
+        """
+        self.model = get_model(_JUDGE_MODEL, _JUDGE_TEMPERATURE, _JUDGE_MAX_TOKENS)
+        self._rate_limiter = rate_limiter or get_rate_limiter()
+        self._cache_dir = cache_dir or config.CACHE_DIR / "llm_judge"
     
     def evaluate_analysis(
         self,
-        analysis_results: Dict[str, Any]
+        analysis_results: Dict[str, Any],
+        cache_policy: str = "enabled"
     ) -> Dict[str, Any]:
         """
         Evaluate the quality of a technical debt analysis.
         
+        Evaluations are cached on disk keyed by a hash of the prompt and
+        judge settings, so re-analyzing an unchanged repository skips the
+        Gemini call.
+        
         Args:
             analysis_results: Complete analysis results from orchestrator
+            cache_policy: One of "enabled" (read and write the cache),
+                "read_only" (never write), "replay" (never call the model)
+                or "disabled" (bypass the cache)
             
         Returns:
             Evaluation scores and feedback
         """
+        if cache_policy not in _CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy: {cache_policy}")
+        
         prompt = self._build_evaluation_prompt(analysis_results)
+        cache_path = self._cache_path(prompt)
         
         try:
-            response = self.model.generate_content(prompt)
-            evaluation = self._parse_evaluation_response(response.text)
+            evaluation = None
+            if cache_policy != "disabled":
+                evaluation = self._read_cache(cache_path)
+            
+            if evaluation is None:
+                if cache_policy == "replay":
+                    raise LookupError("no cached evaluation in replay mode")
+                self._rate_limiter.acquire(estimate_tokens(prompt))
+                response = self.model.generate_content(prompt)
+                evaluation = self._parse_evaluation_response(response.text)
+                # A reply with no parsable scores (malformed or truncated) is
+                # not cached, so the next analysis asks the model again
+                if cache_policy == "enabled" and evaluation["dimensions"]:
+                    self._write_cache(cache_path, evaluation)
             
             return {
                 "overall_score": evaluation["overall_score"],
@@ -52,17 +177,46 @@ class LLMJudge:
                 "strengths": evaluation["strengths"],
                 "weaknesses": evaluation["weaknesses"],
                 "recommendations": evaluation["recommendations"],
-                "evaluated_at": datetime.now().isoformat(),
-                "judge_model": "gemini-2.5-flash-lite"
+                "evaluated_at": utcnow_iso(),
+                "judge_model": _JUDGE_MODEL
             }
             
         except Exception as e:
             return {
                 "overall_score": 0,
                 "error": f"Evaluation failed: {str(e)}",
-                "evaluated_at": datetime.now().isoformat()
+                "evaluated_at": utcnow_iso()
             }
     
+    def _cache_path(self, prompt: str) -> Path:
+        """Get the cache file for a prompt and the current judge settings."""
+        key = hashlib.sha256(
+            f"{prompt}|{_JUDGE_MODEL}|{_JUDGE_TEMPERATURE}|{_JUDGE_MAX_TOKENS}".encode()
+        ).hexdigest()
+        return self._cache_dir / f"{key}.json"
+    
+    def _read_cache(self, cache_path: Path) -> Optional[Dict[str, Any]]:
+        """Load a cached evaluation, or None if missing, expired or unreadable."""
+        try:
+            if time.time() - cache_path.stat().st_mtime > _CACHE_TTL:
+                return None
+            with open(cache_path, 'rb') as f:
+                return loads(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def _write_cache(self, cache_path: Path, evaluation: Dict[str, Any]):
+        """Atomically store an evaluation in the cache."""
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(dumps_compact(evaluation))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Caching is best-effort; the evaluation itself succeeded
+            pass
+    
     def _build_evaluation_prompt(self, results: Dict[str, Any]) -> str:
         """Build evaluation prompt from analysis results."""
         parallel_analysis = results.get("results", {}).get("parallel_analysis", {})
@@ -72,67 +226,24 @@ class LLMJudge:
         cve_data = parallel_analysis.get("cve_analysis", {})
         doc_data = parallel_analysis.get("documentation_analysis", {})
         
-        prompt = f"""You are an expert code quality auditor evaluating a technical debt analysis report.
-
-ANALYSIS RESULTS TO EVALUATE:
-
-Git History Analysis:
-- Risk Score: {git_data.get('risk_score', 0)}/100
-- Total Commits: {git_data.get('total_commits', 0)}
-- High Churn Files: {len(git_data.get('high_churn_files', []))}
-
-Security Analysis:
-- Total Dependencies: {cve_data.get('total_dependencies', 0)}
-- Vulnerabilities Found: {len(cve_data.get('vulnerabilities', []))}
-- Severity Distribution: {cve_data.get('severity_summary', {})}
-
-Documentation Analysis:
-- Coverage: {doc_data.get('coverage', 0):.1%}
-- Total Files: {doc_data.get('total_files', 0)}
-- Documented Files: {doc_data.get('documented_files', 0)}
-
-Impact Assessment:
-- Impact Score: {impact_analysis.get('impact_score', 0)}/100
-- Severity: {impact_analysis.get('severity', 'unknown')}
-- Key Risks: {impact_analysis.get('key_risks', [])}
-- Recommendations: {impact_analysis.get('recommendations', [])}
-
-EVALUATION CRITERIA:
-Rate each dimension on a scale of 0-100:
-
-1. COMPLETENESS (0-100): Does the analysis cover all important aspects?
-2. ACCURACY (0-100): Are the findings technically sound and precise?
-3. ACTIONABILITY (0-100): Are recommendations clear and implementable?
-4. CLARITY (0-100): Is the report well-structured and understandable?
-
-Provide your evaluation in this EXACT format:
-
-OVERALL_SCORE: [0-100]
-
-COMPLETENESS: [0-100]
-ACCURACY: [0-100]
-ACTIONABILITY: [0-100]
-CLARITY: [0-100]
-
-STRENGTHS:
-- [strength 1]
-- [strength 2]
-- [strength 3]
-
-WEAKNESSES:
-- [weakness 1]
-- [weakness 2]
-
-RECOMMENDATIONS:
-- [recommendation 1]
-- [recommendation 2]
-"""
-        return prompt
+        return _JUDGE_PROMPT_PREFIX + _JUDGE_RESULTS_TEMPLATE.substitute(
+            risk_score=git_data.get("risk_score", 0),
+            total_commits=git_data.get("total_commits", 0),
+            churn_count=len(git_data.get("high_churn_files", [])),
+            total_dependencies=cve_data.get("total_dependencies", 0),
+            vuln_count=len(cve_data.get("vulnerabilities", [])),
+            severity_summary=cve_data.get("severity_summary", {}),
+            coverage=f"{doc_data.get('coverage', 0):.1%}",
+            total_files=doc_data.get("total_files", 0),
+            documented_files=doc_data.get("documented_files", 0),
+            impact_score=impact_analysis.get("impact_score", 0),
+            severity=impact_analysis.get("severity", "unknown"),
+            key_risks=impact_analysis.get("key_risks", []),
+            recommendations=impact_analysis.get("recommendations", [])
+        )
     
     def _parse_evaluation_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the LLM judge response into structured data."""
-        lines = response_text.strip().split('\n')
-        
         evaluation = {
             "overall_score": 0,
             "dimensions": {},
@@ -141,58 +252,18 @@ RECOMMENDATIONS:
             "recommendations": []
         }
         
-        current_section = None
+        for match in _SCORE_RE.finditer(response_text):
+            name, score = match.group(1), int(match.group(2))
+            if name == "OVERALL_SCORE":
+                evaluation["overall_score"] = score
+            else:
+                evaluation["dimensions"][name.lower()] = score
         
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith("OVERALL_SCORE:"):
-                try:
-                    evaluation["overall_score"] = int(line.split(":")[1].strip())
-                except:
-                    evaluation["overall_score"] = 0
-            
-            elif line.startswith("COMPLETENESS:"):
-                try:
-                    evaluation["dimensions"]["completeness"] = int(line.split(":")[1].strip())
-                except:
-                    pass
-            
-            elif line.startswith("ACCURACY:"):
-                try:
-                    evaluation["dimensions"]["accuracy"] = int(line.split(":")[1].strip())
-                except:
-                    pass
-            
-            elif line.startswith("ACTIONABILITY:"):
-                try:
-                    evaluation["dimensions"]["actionability"] = int(line.split(":")[1].strip())
-                except:
-                    pass
-            
-            elif line.startswith("CLARITY:"):
-                try:
-                    evaluation["dimensions"]["clarity"] = int(line.split(":")[1].strip())
-                except:
-                    pass
-            
-            elif line == "STRENGTHS:":
-                current_section = "strengths"
-            
-            elif line == "WEAKNESSES:":
-                current_section = "weaknesses"
-            
-            elif line == "RECOMMENDATIONS:":
-                current_section = "recommendations"
-            
-            elif line.startswith("- ") and current_section:
-                item = line[2:].strip()
-                if current_section == "strengths":
-                    evaluation["strengths"].append(item)
-                elif current_section == "weaknesses":
-                    evaluation["weaknesses"].append(item)
-                elif current_section == "recommendations":
-                    evaluation["recommendations"].append(item)
+        for match in _SECTION_RE.finditer(response_text):
+            evaluation[match.group(1).lower()] = [
+                item.strip()[2:].strip() for item in match.group(2).splitlines()
+                if item.strip()
+            ]
         
         # Calculate overall score if not provided
         if evaluation["overall_score"] == 0 and evaluation["dimensions"]:
@@ -217,16 +288,32 @@ RECOMMENDATIONS:
         Returns:
             Evaluation scores for the tool
         """
-        prompt = f"""Evaluate the quality of this {tool_name} tool output:
-
-{tool_output}
-
-Rate the output on:
+        return self.evaluate_tool_outputs({tool_name: tool_output})[tool_name]
+    
+    def evaluate_tool_outputs(
+        self,
+        tool_outputs: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate several tool outputs with a single Gemini request.
+        
+        Args:
+            tool_outputs: Output data keyed by tool name
+            
+        Returns:
+            Evaluation scores keyed by tool name
+        """
+        prompt = "Evaluate the quality of each of these tool outputs:\n"
+        for name, output in tool_outputs.items():
+            prompt += f"\n### {name}\n{output}\n"
+        prompt += """
+Rate each output on:
 1. Data completeness (0-100)
 2. Data accuracy (0-100)
 3. Usefulness (0-100)
 
-Respond in format:
+Respond with one block per tool, in this format:
+### [tool name]
 COMPLETENESS: [score]
 ACCURACY: [score]
 USEFULNESS: [score]
@@ -234,29 +321,36 @@ OVERALL: [average score]
 """
         
         try:
+            self._rate_limiter.acquire(estimate_tokens(prompt))
             response = self.model.generate_content(prompt)
-            # Simple parsing for tool evaluation
-            lines = response.text.strip().split('\n')
-            scores = {}
-            
-            for line in lines:
-                if ':' in line:
-                    key, value = line.split(':')
-                    try:
-                        scores[key.strip().lower()] = int(value.strip())
-                    except:
-                        pass
-            
+        except Exception as e:
             return {
-                "tool_name": tool_name,
+                name: {"tool_name": name, "error": str(e), "overall_score": 0}
+                for name in tool_outputs
+            }
+        
+        # re.split with a capturing group yields [preamble, name, body, ...]
+        parts = _TOOL_HEADER_RE.split(response.text)
+        blocks = dict(zip(parts[1::2], parts[2::2]))
+        if len(tool_outputs) == 1:
+            # A single-tool reply often skips (or renames) the header; its
+            # scores can only belong to that tool
+            (name,) = tool_outputs
+            if name not in blocks:
+                blocks[name] = response.text
+        evaluated_at = utcnow_iso()
+        
+        evaluations = {}
+        for name in tool_outputs:
+            scores = {
+                key.lower(): int(value)
+                for key, value in _TOOL_SCORE_RE.findall(blocks.get(name, ""))
+            }
+            evaluations[name] = {
+                "tool_name": name,
                 "scores": scores,
                 "overall_score": scores.get("overall", 0),
-                "evaluated_at": datetime.now().isoformat()
+                "evaluated_at": evaluated_at
             }
-            
-        except Exception as e:
-            return {
-                "tool_name": tool_name,
-                "error": str(e),
-                "overall_score": 0
-            }
\ No newline at end of file
+        
+        return evaluations
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class EvaluationMetrics:
     """Container for evaluation metrics."""
     analysis_id: str
@@ -60,12 +60,35 @@ class EvaluationMetrics:
         }
 
 
+# Per-analysis fields summed by MetricsAggregator
+_AGGREGATED_FIELDS = (
+    "overall_quality",
+    "completeness",
+    "accuracy",
+    "actionability",
+    "clarity",
+    "total_duration",
+    "issues_found",
+    "vulnerabilities_found",
+)
+
+
 class MetricsAggregator:
     """Aggregates metrics across multiple analyses."""
     
     def __init__(self):
         """Initialize metrics aggregator."""
+        self.clear()
+    
+    def clear(self) -> None:
+        """Forget all recorded analyses and reset the running aggregates."""
         self.metrics_history: List[EvaluationMetrics] = []
+        # Running aggregates updated by add_metrics, so summaries are O(1)
+        self._sums: Dict[str, float] = dict.fromkeys(_AGGREGATED_FIELDS, 0)
+        self._min_duration = float("inf")
+        self._max_duration = float("-inf")
+        self._rating_sum = 0.0
+        self._rating_count = 0
     
     def add_metrics(self, metrics: EvaluationMetrics) -> None:
         """
@@ -75,6 +98,13 @@ class MetricsAggregator:
             metrics: EvaluationMetrics instance
         """
         self.metrics_history.append(metrics)
+        for name in _AGGREGATED_FIELDS:
+            self._sums[name] += getattr(metrics, name)
+        self._min_duration = min(self._min_duration, metrics.total_duration)
+        self._max_duration = max(self._max_duration, metrics.total_duration)
+        if metrics.user_rating > 0:
+            self._rating_sum += metrics.user_rating
+            self._rating_count += 1
     
     def get_average_quality(self) -> float:
         """
@@ -86,8 +116,7 @@ class MetricsAggregator:
         if not self.metrics_history:
             return 0.0
         
-        total = sum(m.overall_quality for m in self.metrics_history)
-        return total / len(self.metrics_history)
+        return self._sums["overall_quality"] / len(self.metrics_history)
     
     def get_average_duration(self) -> float:
         """
@@ -99,8 +128,7 @@ class MetricsAggregator:
         if not self.metrics_history:
             return 0.0
         
-        total = sum(m.total_duration for m in self.metrics_history)
-        return total / len(self.metrics_history)
+        return self._sums["total_duration"] / len(self.metrics_history)
     
     def get_total_issues_found(self) -> int:
         """
@@ -109,7 +137,7 @@ class MetricsAggregator:
         Returns:
             Total issue count
         """
-        return sum(m.issues_found for m in self.metrics_history)
+        return self._sums["issues_found"]
     
     def get_summary(self) -> Dict[str, Any]:
         """
@@ -126,28 +154,30 @@ class MetricsAggregator:
                 "total_issues": 0
             }
         
+        count = len(self.metrics_history)
+        sums = self._sums
+        
         return {
-            "total_analyses": len(self.metrics_history),
+            "total_analyses": count,
             "quality_metrics": {
-                "average_overall": self.get_average_quality(),
-                "average_completeness": sum(m.completeness for m in self.metrics_history) / len(self.metrics_history),
-                "average_accuracy": sum(m.accuracy for m in self.metrics_history) / len(self.metrics_history),
-                "average_actionability": sum(m.actionability for m in self.metrics_history) / len(self.metrics_history),
-                "average_clarity": sum(m.clarity for m in self.metrics_history) / len(self.metrics_history)
+                "average_overall": sums["overall_quality"] / count,
+                "average_completeness": sums["completeness"] / count,
+                "average_accuracy": sums["accuracy"] / count,
+                "average_actionability": sums["actionability"] / count,
+                "average_clarity": sums["clarity"] / count
             },
             "performance_metrics": {
-                "average_duration": self.get_average_duration(),
-                "min_duration": min(m.total_duration for m in self.metrics_history),
-                "max_duration": max(m.total_duration for m in self.metrics_history)
+                "average_duration": sums["total_duration"] / count,
+                "min_duration": self._min_duration,
+                "max_duration": self._max_duration
             },
             "outcome_metrics": {
-                "total_issues_found": self.get_total_issues_found(),
-                "total_vulnerabilities": sum(m.vulnerabilities_found for m in self.metrics_history),
-                "average_issues_per_analysis": self.get_total_issues_found() / len(self.metrics_history)
+                "total_issues_found": sums["issues_found"],
+                "total_vulnerabilities": sums["vulnerabilities_found"],
+                "average_issues_per_analysis": sums["issues_found"] / count
             },
             "user_satisfaction": {
-                "average_rating": sum(m.user_rating for m in self.metrics_history if m.user_rating > 0) / 
-                                 max(1, sum(1 for m in self.metrics_history if m.user_rating > 0))
+                "average_rating": self._rating_sum / max(1, self._rating_count)
             }
         }
 
@@ -0,0 +1,100 @@
+"""Client-side token bucket for pacing Gemini requests."""
+from typing import Optional
+import threading
+import time
+from src import config
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a prompt (about 4 chars per token)."""
+    return len(text) // 4
+
+
+class TokenBucket:
+    """
+    Paces requests to stay within requests-per-minute and tokens-per-minute limits.
+    
+    Both budgets refill continuously at their per-minute rate. A limit of 0
+    leaves that budget unlimited.
+    
+    Usage:
+        bucket = TokenBucket(rpm=15, tpm=250000)
+        bucket.acquire(estimate_tokens(prompt))
+        response = model.generate_content(prompt)
+    """
+    
+    def __init__(self, rpm: int, tpm: int):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rpm: Requests per minute allowed, or 0 for no request limit
+            tpm: Tokens per minute allowed, or 0 for no token limit
+            
+        Raises:
+            ValueError: If either limit is negative
+        """
+        if rpm < 0 or tpm < 0:
+            raise ValueError(f"Rate limits must not be negative (rpm={rpm}, tpm={tpm})")
+        
+        self._request_capacity = rpm
+        self._token_capacity = tpm
+        self._request_rate = rpm / 60  # per second
+        self._token_rate = tpm / 60
+        
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        """
+        Block until one request and estimated_tokens tokens are available.
+        
+        Args:
+            estimated_tokens: Expected tokens for the request
+        """
+        # A single request larger than the whole budget waits for a full bucket
+        needed = min(estimated_tokens, self._token_capacity)
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._updated = now
+                
+                wait = 0.0
+                if self._request_rate:
+                    self._requests = min(
+                        self._request_capacity, self._requests + elapsed * self._request_rate
+                    )
+                    wait = (1 - self._requests) / self._request_rate
+                if self._token_rate:
+                    self._tokens = min(
+                        self._token_capacity, self._tokens + elapsed * self._token_rate
+                    )
+                    wait = max(wait, (needed - self._tokens) / self._token_rate)
+                
+                if wait <= 0:
+                    self._requests -= 1
+                    self._tokens -= needed
+                    return
+            
+            time.sleep(wait)
+
+
+# Global rate limiter shared by every judge in the process
+_global_rate_limiter: Optional[TokenBucket] = None
+
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Get the global Gemini rate limiter.
+    
+    Returns:
+        Global TokenBucket configured from GEMINI_RPM and GEMINI_TPM
+    """
+    global _global_rate_limiter
+    if _global_rate_limiter is None:
+        _global_rate_limiter = TokenBucket(config.GEMINI_RPM, config.GEMINI_TPM)
+    return _global_rate_limiter
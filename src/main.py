@@ -1,21 +1,23 @@
 """Command-line interface for Code Archaeologist AI Agent."""
 import asyncio
 import argparse
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
 from src.agents.orchestrator import TechDebtOrchestrator
 from src import config
+from src.utils.serialization import dumps_pretty
 
 
 def print_banner():
     """Print application banner."""
-    print("\n" + "="*70)
-    print("  CODE ARCHAEOLOGIST AI AGENT")
-    print("  Technical Debt Detection & Analysis System")
-    print("  Multi-Agent AI with Observability & Evaluation")
-    print("="*70 + "\n")
+    sys.stdout.write(
+        "\n" + "="*70 + "\n"
+        "  CODE ARCHAEOLOGIST AI AGENT\n"
+        "  Technical Debt Detection & Analysis System\n"
+        "  Multi-Agent AI with Observability & Evaluation\n"
+        + "="*70 + "\n\n"
+    )
 
 
 def print_summary(results: dict):
@@ -30,70 +32,81 @@ def print_summary(results: dict):
     evaluation = results.get("evaluation", {})
     human_review = results.get("human_review", {})
     
-    print("\nEXECUTIVE SUMMARY")
-    print("-" * 70)
-    print(f"Repository: {results['repo_path']}")
-    print(f"Analysis Type: {results['analysis_type']}")
-    print(f"Correlation ID: {results['correlation_id']}")
-    print(f"Timestamp: {results['timestamp']}")
-    
-    print(f"\nImpact Score: {impact['impact_score']}/100")
-    print(f"Severity: {impact['severity'].upper()}")
-    print(f"Total Issues: {report['executive_summary']['total_issues']}")
+    # Collect every line and write once instead of one print() per line
+    out = [
+        "\nEXECUTIVE SUMMARY",
+        "-" * 70,
+        f"Repository: {results['repo_path']}",
+        f"Analysis Type: {results['analysis_type']}",
+        f"Correlation ID: {results['correlation_id']}",
+        f"Timestamp: {results['timestamp']}",
+        f"\nImpact Score: {impact['impact_score']}/100",
+        f"Severity: {impact['severity'].upper()}",
+        f"Total Issues: {report['executive_summary']['total_issues']}",
+    ]
     
     # Show evaluation scores if available
     if evaluation.get("overall_score"):
-        print(f"\nQUALITY EVALUATION (LLM-as-Judge)")
-        print("-" * 70)
-        print(f"Overall Quality Score: {evaluation['overall_score']}/100")
+        out += [
+            f"\nQUALITY EVALUATION (LLM-as-Judge)",
+            "-" * 70,
+            f"Overall Quality Score: {evaluation['overall_score']}/100",
+        ]
         
         if evaluation.get("dimension_scores"):
             dims = evaluation["dimension_scores"]
-            print(f"  Completeness: {dims.get('completeness', 0)}/100")
-            print(f"  Accuracy: {dims.get('accuracy', 0)}/100")
-            print(f"  Actionability: {dims.get('actionability', 0)}/100")
-            print(f"  Clarity: {dims.get('clarity', 0)}/100")
+            out += [
+                f"  Completeness: {dims.get('completeness', 0)}/100",
+                f"  Accuracy: {dims.get('accuracy', 0)}/100",
+                f"  Actionability: {dims.get('actionability', 0)}/100",
+                f"  Clarity: {dims.get('clarity', 0)}/100",
+            ]
     
     
-    print("\nKEY RISKS:")
-    for i, risk in enumerate(impact['key_risks'], 1):
-        print(f"  {i}. {risk}")
+    out.append("\nKEY RISKS:")
+    out.extend(f"  {i}. {risk}" for i, risk in enumerate(impact['key_risks'], 1))
     
-    print("\nRECOMMENDATIONS:")
-    for i, rec in enumerate(impact['recommendations'], 1):
-        print(f"  {i}. {rec}")
+    out.append("\nRECOMMENDATIONS:")
+    out.extend(f"  {i}. {rec}" for i, rec in enumerate(impact['recommendations'], 1))
     
-    print("\nDETAILED FINDINGS")
-    print("-" * 70)
+    out += ["\nDETAILED FINDINGS", "-" * 70]
     
     # Git Analysis
     git = analysis["parallel_analysis"]["git_analysis"]
-    print(f"\nGit History Analysis:")
-    print(f"  Risk Score: {git['risk_score']}/100")
-    print(f"  Total Commits (last {git['lookback_days']} days): {git['total_commits']}")
-    print(f"  High Churn Files: {len(git['high_churn_files'])}")
+    out += [
+        f"\nGit History Analysis:",
+        f"  Risk Score: {git['risk_score']}/100",
+        f"  Total Commits (last {git['lookback_days']} days): {git['total_commits']}",
+        f"  High Churn Files: {len(git['high_churn_files'])}",
+    ]
     
     # Security Analysis
     cve = analysis["parallel_analysis"]["cve_analysis"]
-    print(f"\nSecurity Vulnerability Scan:")
-    print(f"  Total Dependencies: {cve['total_dependencies']}")
-    print(f"  Vulnerabilities: {len(cve['vulnerabilities'])}")
     severity = cve['severity_summary']
-    print(f"    Critical: {severity['CRITICAL']}")
-    print(f"    High: {severity['HIGH']}")
-    print(f"    Medium: {severity['MEDIUM']}")
-    print(f"    Low: {severity['LOW']}")
+    out += [
+        f"\nSecurity Vulnerability Scan:",
+        f"  Total Dependencies: {cve['total_dependencies']}",
+        f"  Vulnerabilities: {len(cve['vulnerabilities'])}",
+        f"    Critical: {severity['CRITICAL']}",
+        f"    High: {severity['HIGH']}",
+        f"    Medium: {severity['MEDIUM']}",
+        f"    Low: {severity['LOW']}",
+    ]
     
     # Documentation Analysis
     doc = analysis["parallel_analysis"]["documentation_analysis"]
-    print(f"\nDocumentation Analysis:")
-    print(f"  Coverage: {doc['coverage']:.1%}")
-    print(f"  Has README: {doc['has_readme']}")
-    print(f"  Total Files: {doc['total_files']}")
-    print(f"  Documented Files: {doc['documented_files']}")
-    print(f"  Function Coverage: {doc['function_coverage']:.1%}")
-    
-    print("\n" + "="*70 + "\n")
+    out += [
+        f"\nDocumentation Analysis:",
+        f"  Coverage: {doc['coverage']:.1%}",
+        f"  Has README: {doc['has_readme']}",
+        f"  Total Files: {doc['total_files']}",
+        f"  Documented Files: {doc['documented_files']}",
+        f"  Function Coverage: {doc['function_coverage']:.1%}",
+    ]
+    
+    out.append("\n" + "="*70 + "\n")
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 async def main():
@@ -165,26 +178,30 @@ Examples:
         print(f"Analysis type: {args.analysis_type}")
         print()
     
+    # Let tasks that finish without blocking complete eagerly (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
     # Run analysis
     try:
-        orchestrator = TechDebtOrchestrator()
-        results = await orchestrator.analyze_repository(
-            repo_path=args.repo_path,
-            analysis_type=args.analysis_type
-        )
+        async with TechDebtOrchestrator() as orchestrator:
+            results = await orchestrator.analyze_repository(
+                repo_path=args.repo_path,
+                analysis_type=args.analysis_type
+            )
         
         # Save to file if requested
         if args.output:
             output_path = Path(args.output)
             output_path.parent.mkdir(parents=True, exist_ok=True)
             with open(output_path, 'w') as f:
-                json.dump(results, f, indent=2, default=str)
+                f.write(dumps_pretty(results))
             if not args.json_only:
                 print(f"\nReport saved to: {output_path}")
         
         # Display results
         if args.json_only:
-            print(json.dumps(results, indent=2, default=str))
+            print(dumps_pretty(results))
         else:
             print_summary(results)
             if not args.output:
@@ -1,8 +1,19 @@
 """Memory Bank for storing and retrieving historical analysis data."""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Deque, List, Optional, Set, Tuple
+from collections import Counter, deque
 from datetime import datetime
 from pathlib import Path
-import json
+import heapq
+import uuid
+from operator import itemgetter
+from src.utils.serialization import dumps_compact, loads
+
+# Files kept inside a memory bank's storage directory
+_MEMORIES_FILE = "memories.jsonl"
+_INSIGHTS_FILE = "insights.json"
+
+# Only the most recent insights are kept
+_MAX_INSIGHTS = 1000
 
 
 class MemoryBank:
@@ -21,15 +32,33 @@ class MemoryBank:
         Initialize Memory Bank.
         
         Args:
-            storage_path: Path to store memory data (optional, defaults to in-memory)
+            storage_path: Directory to store memory data (optional, defaults to in-memory).
+                A single-file JSON store from older versions at this path is
+                converted to the directory layout, keeping the original
+                alongside as <name>.legacy.
         """
         self.storage_path = storage_path
         self.memories: List[Dict[str, Any]] = []
         self.patterns: Dict[str, Any] = {}
-        self.insights: List[str] = []
+        self._reset_patterns()
+        self.insights: Deque[Dict[str, str]] = deque(maxlen=_MAX_INSIGHTS)
+        
+        # Positions in self.memories, so lookups skip full scans
+        self._by_id: Dict[str, int] = {}
+        self._by_repo: Dict[str, List[int]] = {}
+        self._by_severity: Dict[str, List[int]] = {}
+        self._by_tag: Dict[str, Set[int]] = {}
+        
+        if storage_path and storage_path.is_file():
+            self._migrate_legacy_file()
         
         if storage_path and storage_path.exists():
             self._load_from_disk()
+        
+        # IDs are a random per-bank tag plus a counter, so banks in other
+        # processes sharing this storage directory never issue the same ID
+        self._id_prefix = f"mem_{uuid.uuid4().hex[:8]}_"
+        self._next_id = 0
     
     def store_analysis(
         self,
@@ -48,12 +77,18 @@ class MemoryBank:
         Returns:
             Memory ID
         """
-        memory_id = f"mem_{datetime.now().timestamp()}"
+        # A per-bank counter keeps IDs unique even for stores in the same tick
+        memory_id = f"{self._id_prefix}{self._next_id:08x}"
+        self._next_id += 1
+        
+        now = datetime.now()
+        timestamp_epoch = now.timestamp()
         
         memory_entry = {
             "memory_id": memory_id,
             "repo_path": repo_path,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
+            "timestamp_epoch": timestamp_epoch,
             "analysis_results": analysis_results,
             "tags": tags or [],
             "metadata": {
@@ -63,16 +98,30 @@ class MemoryBank:
         }
         
         self.memories.append(memory_entry)
+        self._index_memory(len(self.memories) - 1)
         
         # Update patterns
         self._update_patterns(memory_entry)
         
-        # Save to disk if configured
+        # Append to disk if configured
         if self.storage_path:
-            self._save_to_disk()
+            self._append_to_disk(memory_entry)
         
         return memory_id
     
+    def retrieve_by_id(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a single analysis by its memory ID.
+        
+        Args:
+            memory_id: ID returned by store_analysis
+            
+        Returns:
+            Memory entry, or None if not found
+        """
+        position = self._by_id.get(memory_id)
+        return None if position is None else self.memories[position]
+    
     def retrieve_by_repo(self, repo_path: str) -> List[Dict[str, Any]]:
         """
         Retrieve all analyses for a specific repository.
@@ -83,10 +132,7 @@ class MemoryBank:
         Returns:
             List of memory entries
         """
-        return [
-            m for m in self.memories
-            if m["repo_path"] == repo_path
-        ]
+        return [self.memories[i] for i in self._by_repo.get(repo_path, ())]
     
     def retrieve_by_severity(self, severity: str) -> List[Dict[str, Any]]:
         """
@@ -98,10 +144,7 @@ class MemoryBank:
         Returns:
             List of memory entries
         """
-        return [
-            m for m in self.memories
-            if m["metadata"]["severity"] == severity
-        ]
+        return [self.memories[i] for i in self._by_severity.get(severity, ())]
     
     def retrieve_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -113,12 +156,10 @@ class MemoryBank:
         Returns:
             List of recent memory entries
         """
-        sorted_memories = sorted(
-            self.memories,
-            key=lambda m: m["timestamp"],
-            reverse=True
-        )
-        return sorted_memories[:limit]
+        # Memories are stored in chronological order, newest last
+        if limit <= 0:
+            return []
+        return self.memories[-limit:][::-1]
     
     def search_memories(
         self,
@@ -139,47 +180,42 @@ class MemoryBank:
         Returns:
             Filtered memory entries
         """
-        results = self.memories.copy()
-        
-        if min_impact_score is not None:
-            results = [
-                m for m in results
-                if m["metadata"]["impact_score"] >= min_impact_score
-            ]
+        # Narrow candidates with the indexes before any per-memory checks
+        candidates: Optional[Set[int]] = None
         
         if severity:
-            results = [
-                m for m in results
-                if m["metadata"]["severity"] == severity
-            ]
+            candidates = set(self._by_severity.get(severity, ()))
         
         if tags:
+            tagged = set().union(*(self._by_tag.get(tag, ()) for tag in tags))
+            candidates = tagged if candidates is None else candidates & tagged
+        
+        if candidates is None:
+            results = self.memories
+        else:
+            results = [self.memories[i] for i in sorted(candidates)]
+        
+        if min_impact_score is not None:
             results = [
                 m for m in results
-                if any(tag in m["tags"] for tag in tags)
+                if m["metadata"]["impact_score"] >= min_impact_score
             ]
         
-        # Sort by timestamp, most recent first
-        results = sorted(
-            results,
-            key=lambda m: m["timestamp"],
-            reverse=True
-        )
-        
-        return results[:limit]
+        # Most recent first; only the top entries need ordering
+        return heapq.nlargest(limit, results, key=itemgetter("timestamp_epoch"))
     
-    def get_learned_insights(self) -> List[str]:
+    def get_learned_insights(self) -> Tuple[Dict[str, str], ...]:
         """
         Get insights learned from historical data.
         
         Returns:
-            List of insights
+            Insights with "insight" text and "learned_at" timestamp, oldest first
         """
-        return self.insights.copy()
+        return tuple(self.insights)
     
     def add_insight(self, insight: str):
         """
-        Add a learned insight.
+        Add a learned insight, dropping the oldest beyond the retention limit.
         
         Args:
             insight: Insight text
@@ -188,6 +224,9 @@ class MemoryBank:
             "insight": insight,
             "learned_at": datetime.now().isoformat()
         })
+        
+        if self.storage_path:
+            self._save_insights()
     
     def get_patterns(self) -> Dict[str, Any]:
         """
@@ -200,38 +239,50 @@ class MemoryBank:
     
     def _update_patterns(self, memory_entry: Dict[str, Any]):
         """Update patterns based on new memory."""
-        severity = memory_entry["metadata"]["severity"]
+        patterns = self.patterns
         
         # Track severity distribution
-        if "severity_distribution" not in self.patterns:
-            self.patterns["severity_distribution"] = {}
-        
-        self.patterns["severity_distribution"][severity] = \
-            self.patterns["severity_distribution"].get(severity, 0) + 1
+        patterns["severity_distribution"][memory_entry["metadata"]["severity"]] += 1
         
         # Track average impact score
-        if "average_impact_score" not in self.patterns:
-            self.patterns["average_impact_score"] = 0
-            self.patterns["total_analyses"] = 0
-        
-        total = self.patterns["total_analyses"]
-        avg = self.patterns["average_impact_score"]
+        total = patterns["total_analyses"]
         new_score = memory_entry["metadata"]["impact_score"]
         
-        self.patterns["average_impact_score"] = \
-            (avg * total + new_score) / (total + 1)
-        self.patterns["total_analyses"] = total + 1
+        patterns["average_impact_score"] = \
+            (patterns["average_impact_score"] * total + new_score) / (total + 1)
+        patterns["total_analyses"] = total + 1
         
         # Track common issues
         results = memory_entry.get("analysis_results", {}).get("results", {})
         impact = results.get("impact_analysis", {})
-        
-        for risk in impact.get("key_risks", []):
-            if "common_risks" not in self.patterns:
-                self.patterns["common_risks"] = {}
-            
-            self.patterns["common_risks"][risk] = \
-                self.patterns["common_risks"].get(risk, 0) + 1
+        patterns["common_risks"].update(impact.get("key_risks", ()))
+    
+    def _reset_patterns(self):
+        """Start pattern tracking from an empty history."""
+        self.patterns = {
+            "severity_distribution": Counter(),
+            "common_risks": Counter(),
+            "average_impact_score": 0,
+            "total_analyses": 0
+        }
+    
+    def _index_memory(self, position: int):
+        """Add the memory at position to the lookup indexes."""
+        memory = self.memories[position]
+        self._by_id[memory["memory_id"]] = position
+        self._by_repo.setdefault(memory["repo_path"], []).append(position)
+        self._by_severity.setdefault(memory["metadata"]["severity"], []).append(position)
+        for tag in memory["tags"]:
+            self._by_tag.setdefault(tag, set()).add(position)
+    
+    def _rebuild_indexes(self):
+        """Rebuild the lookup indexes from self.memories."""
+        self._by_id.clear()
+        self._by_repo.clear()
+        self._by_severity.clear()
+        self._by_tag.clear()
+        for position in range(len(self.memories)):
+            self._index_memory(position)
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -251,8 +302,8 @@ class MemoryBank:
             "total_memories": len(self.memories),
             "total_insights": len(self.insights),
             "patterns_identified": len(self.patterns),
-            "oldest_memory": min(m["timestamp"] for m in self.memories),
-            "newest_memory": max(m["timestamp"] for m in self.memories),
+            "oldest_memory": self.memories[0]["timestamp"],
+            "newest_memory": self.memories[-1]["timestamp"],
             "severity_distribution": self.patterns.get("severity_distribution", {}),
             "average_impact_score": self.patterns.get("average_impact_score", 0)
         }
@@ -260,40 +311,80 @@ class MemoryBank:
     def clear_memories(self):
         """Clear all memories."""
         self.memories.clear()
-        self.patterns.clear()
+        self._reset_patterns()
         self.insights.clear()
+        self._rebuild_indexes()
+        
+        if self.storage_path:
+            (self.storage_path / _MEMORIES_FILE).unlink(missing_ok=True)
+            (self.storage_path / _INSIGHTS_FILE).unlink(missing_ok=True)
     
-    def _save_to_disk(self):
-        """Save memory bank to disk."""
-        if not self.storage_path:
-            return
+    def _append_to_disk(self, memory_entry: Dict[str, Any]):
+        """Append one memory to the on-disk JSON Lines log."""
+        self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.storage_path / _MEMORIES_FILE, 'ab') as f:
+            f.write(dumps_compact(memory_entry) + b"\n")
+    
+    def _save_insights(self):
+        """Save learned insights to disk."""
+        self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        data = {
-            "memories": self.memories,
-            "patterns": self.patterns,
-            "insights": self.insights,
-            "saved_at": datetime.now().isoformat()
-        }
+        with open(self.storage_path / _INSIGHTS_FILE, 'wb') as f:
+            f.write(dumps_compact(list(self.insights)))
+    
+    def _migrate_legacy_file(self):
+        """
+        Convert a legacy single-file JSON store into the directory layout.
         
-        with open(self.storage_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        Raises:
+            ValueError: If the file is not a legacy memory bank
+        """
+        legacy_path = self.storage_path.with_name(self.storage_path.name + ".legacy")
+        try:
+            data = loads(self.storage_path.read_bytes())
+            memories = data["memories"]
+            insights = data.get("insights", [])
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(
+                f"Memory bank storage path {self.storage_path} is a file, "
+                "not a memory bank directory or legacy memory bank file"
+            ) from e
+        
+        # The directory takes the file's place; the original is kept as a backup
+        self.storage_path.rename(legacy_path)
+        self.storage_path.mkdir(parents=True)
+        with open(self.storage_path / _MEMORIES_FILE, 'wb') as f:
+            for memory in memories:
+                f.write(dumps_compact(memory) + b"\n")
+        with open(self.storage_path / _INSIGHTS_FILE, 'wb') as f:
+            f.write(dumps_compact(list(insights)[-_MAX_INSIGHTS:]))
     
     def _load_from_disk(self):
         """Load memory bank from disk."""
         if not self.storage_path or not self.storage_path.exists():
             return
         
+        memories_path = self.storage_path / _MEMORIES_FILE
+        if memories_path.exists():
+            with open(memories_path, 'rb') as f:
+                for line in f:
+                    try:
+                        self.memories.append(loads(line))
+                    except ValueError:
+                        # Skip a line left partially written by an interrupted store
+                        continue
+        
+        # Patterns are derived from the memories, so replay them
+        for memory in self.memories:
+            self._update_patterns(memory)
+        self._rebuild_indexes()
+        
         try:
-            with open(self.storage_path, 'r') as f:
-                data = json.load(f)
-            
-            self.memories = data.get("memories", [])
-            self.patterns = data.get("patterns", {})
-            self.insights = data.get("insights", [])
-        except Exception:
-            # If loading fails, start fresh
+            with open(self.storage_path / _INSIGHTS_FILE, 'rb') as f:
+                self.insights = deque(loads(f.read()), maxlen=_MAX_INSIGHTS)
+        except (OSError, ValueError):
+            # Missing or unreadable insights start fresh
             pass
 
 
@@ -1,11 +1,17 @@
 """Structured logging with correlation IDs for agent tracing."""
 import structlog
+import functools
 import logging
+import os
 import sys
-from typing import Optional
+from typing import Iterator, Optional
+from contextlib import contextmanager
 import uuid
 from datetime import datetime
 
+# Set once structlog has been configured, by setup_logging or lazily
+_configured = False
+
 
 def setup_logging(log_level: str = "INFO") -> None:
     """
@@ -14,6 +20,9 @@ def setup_logging(log_level: str = "INFO") -> None:
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
     """
+    global _configured
+    _configured = True
+    
     # Configure structlog
     structlog.configure(
         processors=[
@@ -33,6 +42,12 @@ def setup_logging(log_level: str = "INFO") -> None:
     )
 
 
+@functools.lru_cache(maxsize=256)
+def _base_logger(name: str) -> structlog.BoundLogger:
+    """Get the unbound structlog logger for a name, created once per name."""
+    return structlog.get_logger(name)
+
+
 def get_logger(name: str, correlation_id: Optional[str] = None) -> structlog.BoundLogger:
     """
     Get a logger instance with optional correlation ID.
@@ -44,7 +59,10 @@ def get_logger(name: str, correlation_id: Optional[str] = None) -> structlog.Bou
     Returns:
         Configured structlog logger
     """
-    logger = structlog.get_logger(name)
+    if not _configured:
+        setup_logging(os.getenv("LOG_LEVEL", "INFO"))
+    
+    logger = _base_logger(name)
     
     if correlation_id:
         logger = logger.bind(correlation_id=correlation_id)
@@ -62,6 +80,35 @@ def generate_correlation_id() -> str:
     return f"req_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}"
 
 
+@contextmanager
+def correlation_scope(correlation_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Bind a correlation ID to every log event emitted within the scope.
+    
+    The ID lives in a context variable, so tasks and threads started with
+    a copy of the current context inherit it.
+    
+    Args:
+        correlation_id: ID to bind (a new one is generated if omitted)
+        
+    Yields:
+        The bound correlation ID
+    """
+    correlation_id = correlation_id or generate_correlation_id()
+    with structlog.contextvars.bound_contextvars(correlation_id=correlation_id):
+        yield correlation_id
+
+
+def get_correlation_id() -> Optional[str]:
+    """
+    Get the correlation ID bound by the enclosing correlation_scope.
+    
+    Returns:
+        Current correlation ID, or None outside any scope
+    """
+    return structlog.contextvars.get_contextvars().get("correlation_id")
+
+
 class LoggerMixin:
     """
     Mixin class to add logging capabilities to agents.
@@ -71,21 +118,17 @@ class LoggerMixin:
             def __init__(self):
                 super().__init__()
                 self.logger.info("Agent initialized")
+        
+        with correlation_scope():
+            MyAgent()
     """
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._correlation_id = generate_correlation_id()
-        self.logger = get_logger(
-            self.__class__.__name__,
-            correlation_id=self._correlation_id
-        )
+        # The correlation ID comes from the request's correlation_scope
+        self.logger = get_logger(self.__class__.__name__)
     
     @property
-    def correlation_id(self) -> str:
-        """Get the correlation ID for this instance."""
-        return self._correlation_id
-
-
-# Initialize logging on module import
-setup_logging()
\ No newline at end of file
+    def correlation_id(self) -> Optional[str]:
+        """Get the correlation ID of the request being handled."""
+        return get_correlation_id()
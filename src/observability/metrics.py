@@ -1,18 +1,169 @@
 """Performance metrics collection and reporting."""
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
+from collections import Counter, deque
+import bisect
 from dataclasses import dataclass, field
-from datetime import datetime
+import math
 import time
 import statistics
+from src.utils.timestamps import ns_to_iso
 
+# Retention limits, so long-running agents use bounded memory
+_MAX_METRIC_POINTS = 10000
+_EXACT_QUANTILE_SAMPLES = 100  # per timer, before switching to P-square
 
-@dataclass
+
+@dataclass(slots=True)
 class MetricPoint:
     """Single metric measurement."""
     name: str
     value: float
-    timestamp: datetime
+    timestamp: int  # time.time_ns(); formatted only when serialized
     tags: Dict[str, str] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metric point to dictionary."""
+        return {
+            "name": self.name,
+            "value": self.value,
+            "timestamp": ns_to_iso(self.timestamp),
+            "tags": self.tags
+        }
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P-square algorithm (Jain & Chlamtac).
+    
+    The first observations are kept and the quantile is computed exactly.
+    Past that, five markers track the minimum, the target quantile, the
+    maximum and two points between, so each update and read is O(1).
+    """
+    
+    __slots__ = ("p", "samples", "heights", "positions", "desired", "increments")
+    
+    def __init__(self, p: float):
+        """
+        Initialize the estimator.
+        
+        Args:
+            p: Quantile to track, between 0 and 1
+        """
+        self.p = p
+        self.samples: Optional[List[float]] = []  # sorted; None once estimating
+        self.heights: List[float] = []
+        self.positions: List[int] = []
+        self.desired: List[float] = []
+        self.increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+    
+    def add(self, x: float) -> None:
+        """Fold one observation into the estimate."""
+        if self.samples is not None:
+            bisect.insort(self.samples, x)
+            if len(self.samples) > _EXACT_QUANTILE_SAMPLES:
+                self._start_markers()
+            return
+        
+        # Find the cell containing x, extending the extremes if needed
+        q = self.heights
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self.desired
+        for i in range(5):
+            desired[i] += self.increments[i]
+        
+        # Move the middle markers toward their desired positions
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                height = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < height < q[i + 1]:
+                    # Parabolic prediction left the cell; fall back to linear
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+    
+    def _start_markers(self) -> None:
+        """Seed the markers from the exact samples, then drop the samples."""
+        samples = self.samples
+        last = len(samples) - 1
+        positions = [round(last * f) for f in self.increments]
+        
+        # Markers must sit on distinct ranks
+        for i in range(1, 4):
+            positions[i] = max(positions[i], positions[i - 1] + 1)
+        for i in range(3, 0, -1):
+            positions[i] = min(positions[i], positions[i + 1] - 1)
+        
+        self.positions = positions
+        self.heights = [samples[i] for i in positions]
+        self.desired = [last * f for f in self.increments]
+        self.samples = None
+    
+    def value(self) -> float:
+        """Current estimate of the quantile."""
+        samples = self.samples
+        if samples is None:
+            return self.heights[2]
+        if len(samples) == 1:
+            return samples[0]
+        if self.p == 0.5:
+            return statistics.median(samples)
+        return statistics.quantiles(samples, n=100)[round(self.p * 100) - 1]
+
+
+@dataclass(slots=True)
+class TimerStats:
+    """Running statistics for one timer, updated per recorded duration."""
+    count: int = 0
+    total: float = 0.0
+    mean: float = 0.0
+    m2: float = 0.0  # sum of squared deviations from the mean (Welford)
+    min: float = math.inf
+    max: float = -math.inf
+    median: P2Quantile = field(default_factory=lambda: P2Quantile(0.5))
+    p95: P2Quantile = field(default_factory=lambda: P2Quantile(0.95))
+    
+    def add(self, duration: float) -> None:
+        """Fold one duration into the statistics."""
+        self.count += 1
+        self.total += duration
+        delta = duration - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (duration - self.mean)
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+        self.median.add(duration)
+        self.p95.add(duration)
+    
+    def summary(self) -> Dict[str, float]:
+        """Summarize the timer; median and p95 are streaming estimates."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "stdev": math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0,
+            "median": self.median.value(),
+            "min": self.min,
+            "max": self.max,
+            "p95": self.p95.value()
+        }
 
 
 class MetricsCollector:
@@ -27,9 +178,12 @@ class MetricsCollector:
     
     def __init__(self):
         """Initialize metrics collector."""
-        self.metrics: List[MetricPoint] = []
-        self.counters: Dict[str, int] = {}
-        self.timers: Dict[str, List[float]] = {}
+        # Only the most recent points are kept; _recorded counts all of them
+        self.metrics: Deque[MetricPoint] = deque(maxlen=_MAX_METRIC_POINTS)
+        self._by_name: Dict[str, Deque[MetricPoint]] = {}
+        self._recorded = 0
+        self.counters: Counter[str] = Counter()
+        self.timers: Dict[str, TimerStats] = {}
     
     def record(
         self,
@@ -48,10 +202,21 @@ class MetricsCollector:
         metric = MetricPoint(
             name=metric_name,
             value=value,
-            timestamp=datetime.now(),
+            timestamp=time.time_ns(),
             tags=tags or {}
         )
+        
+        # Keep the name index in step with the ring buffer's eviction
+        if len(self.metrics) == self.metrics.maxlen:
+            evicted = self.metrics[0]
+            same_name = self._by_name[evicted.name]
+            same_name.popleft()
+            if not same_name:
+                del self._by_name[evicted.name]
+        
         self.metrics.append(metric)
+        self._by_name.setdefault(metric_name, deque()).append(metric)
+        self._recorded += 1
     
     def increment(self, counter_name: str, count: int = 1) -> None:
         """
@@ -61,7 +226,7 @@ class MetricsCollector:
             counter_name: Name of the counter
             count: Amount to increment (default: 1)
         """
-        self.counters[counter_name] = self.counters.get(counter_name, 0) + count
+        self.counters[counter_name] += count
     
     def record_duration(self, timer_name: str, duration: float) -> None:
         """
@@ -71,9 +236,10 @@ class MetricsCollector:
             timer_name: Name of the timer
             duration: Duration in seconds
         """
-        if timer_name not in self.timers:
-            self.timers[timer_name] = []
-        self.timers[timer_name].append(duration)
+        stats = self.timers.get(timer_name)
+        if stats is None:
+            stats = self.timers[timer_name] = TimerStats()
+        stats.add(duration)
     
     def get_summary(self) -> Dict[str, Any]:
         """
@@ -82,26 +248,14 @@ class MetricsCollector:
         Returns:
             Dictionary containing metric summaries
         """
-        summary = {
-            "total_metrics": len(self.metrics),
-            "counters": self.counters.copy(),
-            "timers": {}
+        return {
+            "total_metrics": self._recorded,
+            "counters": dict(self.counters),
+            "timers": {
+                timer_name: stats.summary()
+                for timer_name, stats in self.timers.items()
+            }
         }
-        
-        # Aggregate timer statistics
-        for timer_name, durations in self.timers.items():
-            if durations:
-                summary["timers"][timer_name] = {
-                    "count": len(durations),
-                    "total": sum(durations),
-                    "mean": statistics.mean(durations),
-                    "median": statistics.median(durations),
-                    "min": min(durations),
-                    "max": max(durations),
-                    "p95": statistics.quantiles(durations, n=20)[18] if len(durations) > 1 else durations[0]
-                }
-        
-        return summary
     
     def get_metrics_by_name(self, metric_name: str) -> List[MetricPoint]:
         """
@@ -113,11 +267,13 @@ class MetricsCollector:
         Returns:
             List of matching metric points
         """
-        return [m for m in self.metrics if m.name == metric_name]
+        return list(self._by_name.get(metric_name, ()))
     
     def reset(self) -> None:
         """Reset all metrics."""
         self.metrics.clear()
+        self._by_name.clear()
+        self._recorded = 0
         self.counters.clear()
         self.timers.clear()
 
@@ -154,6 +310,8 @@ class MetricsMixin:
 class TimerContext:
     """Context manager for timing operations."""
     
+    __slots__ = ("metrics", "name", "start_time", "_success_key", "_error_key")
+    
     def __init__(self, metrics: MetricsCollector, name: str):
         """
         Initialize timer context.
@@ -165,22 +323,24 @@ class TimerContext:
         self.metrics = metrics
         self.name = name
         self.start_time = None
+        self._success_key = f"{name}.success"
+        self._error_key = f"{name}.error"
     
     def __enter__(self):
         """Start timing."""
-        self.start_time = time.time()
+        self.start_time = time.perf_counter_ns()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stop timing and record duration."""
-        duration = time.time() - self.start_time
+        duration = (time.perf_counter_ns() - self.start_time) / 1e9
         self.metrics.record_duration(self.name, duration)
         
         # Also increment success/error counters
         if exc_type is None:
-            self.metrics.increment(f"{self.name}.success")
+            self.metrics.increment(self._success_key)
         else:
-            self.metrics.increment(f"{self.name}.error")
+            self.metrics.increment(self._error_key)
 
 
 # Global metrics instance
@@ -1,11 +1,17 @@
 """Distributed tracing for agent workflow visibility."""
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ALWAYS_OFF, ParentBased, TraceIdRatioBased
 from opentelemetry.sdk.resources import Resource
 from typing import Optional, Dict, Any
+import asyncio
 import functools
 import time
+from src import config
+
+# Monotonic clock for span durations, bound once for the wrappers' hot path
+_perf_counter = time.perf_counter
 
 
 # Global tracer provider
@@ -25,19 +31,32 @@ def setup_tracing(service_name: str = "code-archaeologist") -> None:
     # Create resource with service name
     resource = Resource.create({"service.name": service_name})
     
+    # Sample a share of root traces; children follow their parent's decision,
+    # so unsampled requests skip span bookkeeping end to end
+    if config.ENABLE_TRACING:
+        sampler = ParentBased(TraceIdRatioBased(config.TRACE_SAMPLE_RATIO))
+    else:
+        sampler = ALWAYS_OFF
+    
     # Create tracer provider
-    _tracer_provider = TracerProvider(resource=resource)
+    _tracer_provider = TracerProvider(resource=resource, sampler=sampler)
     
-    # Add console exporter for development
-    console_exporter = ConsoleSpanExporter()
-    span_processor = SimpleSpanProcessor(console_exporter)
-    _tracer_provider.add_span_processor(span_processor)
+    # Console export is opt-in for development; batching keeps stdout
+    # serialization off the traced call's thread
+    if config.DEBUG_TRACING:
+        span_processor = BatchSpanProcessor(
+            ConsoleSpanExporter(),
+            max_export_batch_size=512,
+            schedule_delay_millis=5000
+        )
+        _tracer_provider.add_span_processor(span_processor)
     
     # Set as global tracer provider
     trace.set_tracer_provider(_tracer_provider)
     
-    # Get tracer
-    _tracer = trace.get_tracer(__name__)
+    # Get tracer from this provider, which stays in use even if a global
+    # provider had already been set
+    _tracer = _tracer_provider.get_tracer(__name__)
 
 
 def get_tracer() -> trace.Tracer:
@@ -59,6 +78,8 @@ def trace_function(span_name: Optional[str] = None):
     """
     Decorator to trace function execution.
     
+    With ENABLE_TRACING off, functions are returned undecorated.
+    
     Args:
         span_name: Optional custom span name (defaults to function name)
         
@@ -68,64 +89,75 @@ def trace_function(span_name: Optional[str] = None):
             pass
     """
     def decorator(func):
+        if not config.ENABLE_TRACING:
+            return func
+        
+        # Resolved once per decorated function rather than on every call
+        name = span_name or f"{func.__module__}.{func.__name__}"
+        attributes = {
+            "function.name": func.__name__,
+            "function.module": func.__module__
+        }
+        
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            tracer = get_tracer()
-            name = span_name or f"{func.__module__}.{func.__name__}"
+            tracer = _tracer or get_tracer()
             
-            with tracer.start_as_current_span(name) as span:
-                # Add function metadata
-                span.set_attribute("function.name", func.__name__)
-                span.set_attribute("function.module", func.__module__)
+            with tracer.start_as_current_span(name, attributes=attributes) as span:
+                # Unsampled spans discard attributes, so skip building them
+                if not span.is_recording():
+                    return await func(*args, **kwargs)
                 
                 # Record start time
-                start_time = time.time()
+                start_time = _perf_counter()
                 
                 try:
                     result = await func(*args, **kwargs)
                     span.set_attribute("status", "success")
                     return result
                 except Exception as e:
-                    span.set_attribute("status", "error")
-                    span.set_attribute("error.type", type(e).__name__)
-                    span.set_attribute("error.message", str(e))
+                    span.set_attributes({
+                        "status": "error",
+                        "error.type": type(e).__name__,
+                        "error.message": str(e)
+                    })
                     span.record_exception(e)
                     raise
                 finally:
                     # Record duration
-                    duration = time.time() - start_time
+                    duration = _perf_counter() - start_time
                     span.set_attribute("duration_ms", duration * 1000)
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            tracer = get_tracer()
-            name = span_name or f"{func.__module__}.{func.__name__}"
+            tracer = _tracer or get_tracer()
             
-            with tracer.start_as_current_span(name) as span:
-                # Add function metadata
-                span.set_attribute("function.name", func.__name__)
-                span.set_attribute("function.module", func.__module__)
+            with tracer.start_as_current_span(name, attributes=attributes) as span:
+                # Unsampled spans discard attributes, so skip building them
+                if not span.is_recording():
+                    return func(*args, **kwargs)
                 
                 # Record start time
-                start_time = time.time()
+                start_time = _perf_counter()
                 
                 try:
                     result = func(*args, **kwargs)
                     span.set_attribute("status", "success")
                     return result
                 except Exception as e:
-                    span.set_attribute("status", "error")
-                    span.set_attribute("error.type", type(e).__name__)
-                    span.set_attribute("error.message", str(e))
+                    span.set_attributes({
+                        "status": "error",
+                        "error.type": type(e).__name__,
+                        "error.message": str(e)
+                    })
                     span.record_exception(e)
                     raise
                 finally:
                     # Record duration
-                    duration = time.time() - start_time
+                    duration = _perf_counter() - start_time
                     span.set_attribute("duration_ms", duration * 1000)
         
         # Return appropriate wrapper based on function type
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
@@ -167,8 +199,4 @@ class TracerMixin:
             for key, value in attributes.items():
                 span.set_attribute(key, str(value))
         
-        return span
-
-
-# Initialize tracing on module import
-setup_tracing()
\ No newline at end of file
+        return span
\ No newline at end of file
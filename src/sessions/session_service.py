@@ -1,20 +1,34 @@
 """Session management for maintaining analysis state and conversation history."""
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
+import itertools
+import time
 import uuid
+from src.utils.timestamps import ns_to_iso
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """Represents an analysis session."""
     session_id: str
-    created_at: datetime
-    updated_at: datetime
+    # time.time_ns() values; formatted only in to_dict
+    created_at_ns: int
+    updated_at_ns: int
     state: Dict[str, Any] = field(default_factory=dict)
     conversation_history: List[Dict[str, Any]] = field(default_factory=list)
     analysis_results: Optional[Dict[str, Any]] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Set by the owning service so it can track update recency
+    _on_update: Optional[Callable[["Session", int], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    
+    def _mark_updated(self, now_ns: int, messages_added: int = 0):
+        """Set updated_at_ns and notify the owning service."""
+        self.updated_at_ns = now_ns
+        if self._on_update is not None:
+            self._on_update(self, messages_added)
     
     def add_message(self, role: str, content: str, metadata: Optional[Dict] = None):
         """
@@ -25,14 +39,16 @@ class Session:
             content: Message content
             metadata: Optional metadata
         """
+        # Stored as time.time_ns(); to_dict formats it as "timestamp"
+        now_ns = time.time_ns()
         message = {
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp_ns": now_ns,
             "metadata": metadata or {}
         }
         self.conversation_history.append(message)
-        self.updated_at = datetime.now()
+        self._mark_updated(now_ns, messages_added=1)
     
     def update_state(self, key: str, value: Any):
         """
@@ -43,7 +59,7 @@ class Session:
             value: State value
         """
         self.state[key] = value
-        self.updated_at = datetime.now()
+        self._mark_updated(time.time_ns())
     
     def get_state(self, key: str, default: Any = None) -> Any:
         """
@@ -62,10 +78,18 @@ class Session:
         """Convert session to dictionary."""
         return {
             "session_id": self.session_id,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": ns_to_iso(self.created_at_ns),
+            "updated_at": ns_to_iso(self.updated_at_ns),
             "state": self.state,
-            "conversation_history": self.conversation_history,
+            "conversation_history": [
+                {
+                    "role": message["role"],
+                    "content": message["content"],
+                    "timestamp": ns_to_iso(message["timestamp_ns"]),
+                    "metadata": message["metadata"]
+                }
+                for message in self.conversation_history
+            ],
             "analysis_results": self.analysis_results,
             "metadata": self.metadata
         }
@@ -89,8 +113,13 @@ class InMemorySessionService:
         Args:
             max_sessions: Maximum number of sessions to keep in memory
         """
-        self.sessions: Dict[str, Session] = {}
+        # Ordered least to most recently updated, so the oldest is first
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
         self.max_sessions = max_sessions
+        
+        # Running statistics, so get_statistics never scans the sessions
+        self._by_creation: Dict[str, Session] = {}  # oldest created first
+        self._total_messages = 0
     
     def create_session(
         self,
@@ -106,16 +135,18 @@ class InMemorySessionService:
             New Session instance
         """
         session_id = f"session_{uuid.uuid4().hex[:12]}"
-        now = datetime.now()
+        now_ns = time.time_ns()
         
         session = Session(
             session_id=session_id,
-            created_at=now,
-            updated_at=now,
-            metadata=metadata or {}
+            created_at_ns=now_ns,
+            updated_at_ns=now_ns,
+            metadata=metadata or {},
+            _on_update=self._mark_recent
         )
         
         self.sessions[session_id] = session
+        self._by_creation[session_id] = session
         
         # Enforce max sessions limit
         if len(self.sessions) > self.max_sessions:
@@ -162,7 +193,7 @@ class InMemorySessionService:
         
         if analysis_results:
             session.analysis_results = analysis_results
-            session.updated_at = datetime.now()
+            session._mark_updated(time.time_ns())
         
         return session
     
@@ -176,10 +207,11 @@ class InMemorySessionService:
         Returns:
             True if deleted, False if not found
         """
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._forget(session)
+        return True
     
     def list_sessions(
         self,
@@ -196,12 +228,10 @@ class InMemorySessionService:
         Returns:
             List of sessions
         """
-        sessions = sorted(
-            self.sessions.values(),
-            key=lambda s: s.updated_at,
-            reverse=True
-        )
-        return sessions[offset:offset + limit]
+        # Most recently updated sessions are at the end
+        return list(itertools.islice(
+            reversed(self.sessions.values()), offset, offset + limit
+        ))
     
     def get_session_count(self) -> int:
         """
@@ -215,17 +245,25 @@ class InMemorySessionService:
     def clear_all_sessions(self):
         """Clear all sessions."""
         self.sessions.clear()
+        self._by_creation.clear()
+        self._total_messages = 0
     
     def _evict_oldest_session(self):
         """Remove the oldest session to maintain max_sessions limit."""
-        if not self.sessions:
-            return
-        
-        oldest_session_id = min(
-            self.sessions.keys(),
-            key=lambda sid: self.sessions[sid].updated_at
-        )
-        del self.sessions[oldest_session_id]
+        if self.sessions:
+            _, session = self.sessions.popitem(last=False)
+            self._forget(session)
+    
+    def _forget(self, session: Session):
+        """Drop a removed session from the running statistics."""
+        del self._by_creation[session.session_id]
+        self._total_messages -= len(session.conversation_history)
+    
+    def _mark_recent(self, session: Session, messages_added: int):
+        """Move an updated session to the most recent end."""
+        if self.sessions.get(session.session_id) is session:
+            self.sessions.move_to_end(session.session_id)
+            self._total_messages += messages_added
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -241,20 +279,15 @@ class InMemorySessionService:
                 "average_conversation_length": 0
             }
         
-        total_messages = sum(
-            len(s.conversation_history) for s in self.sessions.values()
-        )
+        oldest = next(iter(self._by_creation.values()))
+        newest = next(reversed(self._by_creation.values()))
         
         return {
             "total_sessions": len(self.sessions),
             "active_sessions": len(self.sessions),
-            "average_conversation_length": total_messages / len(self.sessions),
-            "oldest_session": min(
-                s.created_at for s in self.sessions.values()
-            ).isoformat(),
-            "newest_session": max(
-                s.created_at for s in self.sessions.values()
-            ).isoformat()
+            "average_conversation_length": self._total_messages / len(self.sessions),
+            "oldest_session": ns_to_iso(oldest.created_at_ns),
+            "newest_session": ns_to_iso(newest.created_at_ns)
         }
 
 
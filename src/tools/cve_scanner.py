@@ -1,10 +1,76 @@
 """CVE scanner tool for detecting vulnerable dependencies."""
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 import time
+from src.evaluation.rate_limiter import TokenBucket
+from src.utils.serialization import loads
+
+# Dependency line patterns, matched over a whole file at once:
+# package==version / package>=version, and gem 'name', 'version'
+_REQ_RE = re.compile(r'^[ \t]*([a-zA-Z0-9\-_]+)([>=<]+)([0-9\.]+)', re.MULTILINE)
+_GEM_RE = re.compile(
+    r"^gem[^\S\n]+['\"]([^'\"]+)['\"].*?['\"]([0-9\.]+)['\"]", re.MULTILINE
+)
+
+# Known vulnerable packages for demo (simplified), keyed by (package, version)
+# In production, would query NVD API or OSV API
+_KNOWN_VULNS: Dict[Tuple[str, str], Dict[str, str]] = {
+    ("requests", "2.25.0"): {
+        "cve": "CVE-2021-DEMO",
+        "severity": "HIGH",
+        "description": "Demonstration vulnerability"
+    },
+    ("django", "2.2.0"): {
+        "cve": "CVE-2020-DEMO",
+        "severity": "CRITICAL",
+        "description": "Demonstration SQL injection"
+    }
+}
+
+_NVD_URL = "https://services.nvd.nist.gov/rest/json/cves/2.0"
+_NVD_WORKERS = 8
+_NVD_TIMEOUT = 30
+# NVD allows 50 requests per rolling 30 seconds with an API key. A full bucket
+# of 30 plus 15 refilled in any 30 seconds stays under that limit.
+_NVD_RPM = 30
+# Attempts per lookup for throttled or failing responses; each attempt is
+# paced by _NVD_RATE, so retries count against the request budget
+_NVD_ATTEMPTS = 3
+_NVD_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_NVD_BACKOFF = 1
+# Wall-clock budget for all NVD lookups of one scan; unfinished lookups
+# are reported as failed
+_NVD_DEADLINE = 120
+
+
+def _build_http_session() -> requests.Session:
+    """Create a keep-alive HTTP session that retries failed NVD connections."""
+    # Only connection errors are retried here, since those requests never
+    # reached NVD; status retries happen in _lookup_nvd so they are paced
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=0,
+        status=0,
+        backoff_factor=1,
+        allowed_methods=("GET",)
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared connection pool and pacing for NVD requests
+_HTTP = _build_http_session()
+_NVD_RATE = TokenBucket(rpm=_NVD_RPM, tpm=0)
 
 
 def scan_dependencies_for_cves(
@@ -48,7 +114,9 @@ def scan_dependencies_for_cves(
             }
         
         # Scan for CVEs (simplified - in production would use NVD API)
-        vulnerabilities = _check_vulnerabilities(found_dependencies, nvd_api_key)
+        vulnerabilities, failed_lookups = _check_vulnerabilities(
+            found_dependencies, nvd_api_key
+        )
         
         # Calculate severity summary
         severity_counts = {
@@ -67,6 +135,7 @@ def scan_dependencies_for_cves(
             "vulnerabilities": vulnerabilities,
             "total_dependencies": len(found_dependencies),
             "severity_summary": severity_counts,
+            "failed_lookups": failed_lookups,
             "scan_status": "completed",
             "scanned_at": datetime.now().isoformat()
         }
@@ -82,42 +151,31 @@ def scan_dependencies_for_cves(
 
 def _parse_requirements(file_path: Path) -> List[Dict[str, str]]:
     """Parse Python requirements.txt file."""
-    dependencies = []
     try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    # Simple parsing: package==version or package>=version
-                    match = re.match(r'([a-zA-Z0-9\-_]+)([>=<]+)([0-9\.]+)', line)
-                    if match:
-                        dependencies.append({
-                            "name": match.group(1),
-                            "version": match.group(3),
-                            "ecosystem": "pypi"
-                        })
+        text = file_path.read_text()
     except Exception:
-        pass
-    return dependencies
+        return []
+    
+    # Simple parsing: package==version or package>=version; comments never match
+    return [
+        {"name": match.group(1), "version": match.group(3), "ecosystem": "pypi"}
+        for match in _REQ_RE.finditer(text)
+    ]
 
 
 def _parse_package_json(file_path: Path) -> List[Dict[str, str]]:
     """Parse Node.js package.json file."""
     dependencies = []
     try:
-        import json
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            for dep_type in ["dependencies", "devDependencies"]:
-                if dep_type in data:
-                    for name, version in data[dep_type].items():
-                        # Remove ^ or ~ from version
-                        clean_version = version.lstrip('^~')
-                        dependencies.append({
-                            "name": name,
-                            "version": clean_version,
-                            "ecosystem": "npm"
-                        })
+        data = loads(file_path.read_bytes())
+        for dep_type in ("dependencies", "devDependencies"):
+            for name, version in data.get(dep_type, {}).items():
+                # Remove ^ or ~ from version
+                dependencies.append({
+                    "name": name,
+                    "version": version.lstrip('^~'),
+                    "ecosystem": "npm"
+                })
     except Exception:
         pass
     return dependencies
@@ -125,20 +183,15 @@ def _parse_package_json(file_path: Path) -> List[Dict[str, str]]:
 
 def _parse_gemfile(file_path: Path) -> List[Dict[str, str]]:
     """Parse Ruby Gemfile."""
-    dependencies = []
     try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                match = re.match(r"gem\s+['\"]([^'\"]+)['\"].*?['\"]([0-9\.]+)['\"]", line)
-                if match:
-                    dependencies.append({
-                        "name": match.group(1),
-                        "version": match.group(2),
-                        "ecosystem": "rubygems"
-                    })
+        text = file_path.read_text()
     except Exception:
-        pass
-    return dependencies
+        return []
+    
+    return [
+        {"name": match.group(1), "version": match.group(2), "ecosystem": "rubygems"}
+        for match in _GEM_RE.finditer(text)
+    ]
 
 
 def _parse_pom_xml(file_path: Path) -> List[Dict[str, str]]:
@@ -151,41 +204,25 @@ def _parse_pom_xml(file_path: Path) -> List[Dict[str, str]]:
 def _check_vulnerabilities(
     dependencies: List[Dict[str, str]],
     nvd_api_key: str = ""
-) -> List[Dict[str, Any]]:
+) -> Tuple[List[Dict[str, Any]], List[str]]:
     """
     Check dependencies against vulnerability databases.
     
-    Note: This is a simplified implementation for demonstration.
-    In production, would make actual NVD API calls.
+    Note: The built-in table is a simplified demonstration set.
+    When an NVD API key is given, the NVD API is queried as well.
+    
+    Returns:
+        Tuple of (vulnerabilities, "name==version" of failed NVD lookups)
     """
     vulnerabilities = []
     
-    # Known vulnerable packages for demo (simplified)
-    # In production, would query NVD API or OSV API
-    known_vulns = {
-        "requests": {
-            "2.25.0": {
-                "cve": "CVE-2021-DEMO",
-                "severity": "HIGH",
-                "description": "Demonstration vulnerability"
-            }
-        },
-        "django": {
-            "2.2.0": {
-                "cve": "CVE-2020-DEMO",
-                "severity": "CRITICAL",
-                "description": "Demonstration SQL injection"
-            }
-        }
-    }
-    
     for dep in dependencies:
         name = dep["name"].lower()
         version = dep["version"]
         
         # Check against known vulnerabilities
-        if name in known_vulns and version in known_vulns[name]:
-            vuln_info = known_vulns[name][version]
+        vuln_info = _KNOWN_VULNS.get((name, version))
+        if vuln_info is not None:
             vulnerabilities.append({
                 "package": name,
                 "version": version,
@@ -195,15 +232,146 @@ def _check_vulnerabilities(
                 "description": vuln_info["description"]
             })
     
-    # In production, would make API calls like:
-    # if nvd_api_key:
-    #     headers = {"apiKey": nvd_api_key}
-    #     response = requests.get(
-    #         f"https://services.nvd.nist.gov/rest/json/cves/2.0?keywordSearch={name}",
-    #         headers=headers
-    #     )
-    #     # Process response...
+    failed_lookups = []
+    if nvd_api_key:
+        nvd_vulnerabilities, failed_lookups = _query_nvd(dependencies, nvd_api_key)
+        vulnerabilities.extend(nvd_vulnerabilities)
     
+    return vulnerabilities, failed_lookups
+
+
+def _query_nvd(
+    dependencies: List[Dict[str, str]],
+    nvd_api_key: str
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Look up dependencies in the NVD API, several requests at a time.
+    
+    Args:
+        dependencies: Parsed dependencies
+        nvd_api_key: NVD API key
+        
+    Returns:
+        Tuple of (vulnerabilities in dependency order, "name==version" of
+        each lookup that failed, also in dependency order)
+    """
+    if not dependencies:
+        return [], []
+    
+    failed = [False] * len(dependencies)
+    
+    findings: List[Tuple[Dict[str, Any], ...]] = [() for _ in dependencies]
+    
+    # Not a with block: on timeout, shutting down must not wait for the
+    # lookups still running
+    pool = ThreadPoolExecutor(max_workers=min(_NVD_WORKERS, len(dependencies)))
+    try:
+        futures = {
+            pool.submit(
+                _lookup_nvd, dep["name"].lower(), dep["version"], dep["ecosystem"], nvd_api_key
+            ): index
+            for index, dep in enumerate(dependencies)
+        }
+        for future in as_completed(futures, timeout=_NVD_DEADLINE):
+            try:
+                findings[futures[future]] = future.result()
+            except Exception:
+                failed[futures[future]] = True
+    except TimeoutError:
+        for future, index in futures.items():
+            if not future.done():
+                failed[index] = True
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    # Copy cached findings so callers cannot mutate the cache
+    vulnerabilities = [dict(vuln) for dep_findings in findings for vuln in dep_findings]
+    failed_lookups = [
+        f"{dep['name']}=={dep['version']}"
+        for dep, dep_failed in zip(dependencies, failed) if dep_failed
+    ]
+    return vulnerabilities, failed_lookups
+
+
+@functools.lru_cache(maxsize=8192)
+def _lookup_nvd(
+    name: str,
+    version: str,
+    ecosystem: str,
+    nvd_api_key: str
+) -> Tuple[Dict[str, Any], ...]:
+    """
+    Look up one package version in NVD, memoized for the process lifetime.
+    
+    The same dependency often appears across repositories scanned by one
+    process. Failed lookups raise and are therefore not cached.
+    """
+    for attempt in range(_NVD_ATTEMPTS):
+        _NVD_RATE.acquire()
+        try:
+            data = _fetch_nvd(_HTTP, name, version, {"apiKey": nvd_api_key})
+            break
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status not in _NVD_RETRY_STATUSES or attempt == _NVD_ATTEMPTS - 1:
+                raise
+            # Honour a Retry-After given in seconds, else back off exponentially
+            retry_after = e.response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else _NVD_BACKOFF * 2 ** attempt
+            time.sleep(min(delay, _NVD_TIMEOUT))
+    dep = {"name": name, "version": version, "ecosystem": ecosystem}
+    return tuple(_parse_nvd_response(dep, data))
+
+
+def _fetch_nvd(
+    session: requests.Session,
+    name: str,
+    version: str,
+    headers: Dict[str, str]
+) -> Dict[str, Any]:
+    """Fetch NVD CVE records matching a package name and version."""
+    response = session.get(
+        _NVD_URL,
+        params={"keywordSearch": f"{name} {version}"},
+        headers=headers,
+        timeout=_NVD_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _parse_nvd_response(
+    dep: Dict[str, str],
+    data: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Convert an NVD CVE API response into vulnerability findings."""
+    vulnerabilities = []
+    for item in data.get("vulnerabilities", []):
+        cve = item.get("cve", {})
+        
+        # Prefer the newest CVSS version that has a rating
+        severity = "UNKNOWN"
+        metrics = cve.get("metrics", {})
+        for key in ("cvssMetricV31", "cvssMetricV30"):
+            if metrics.get(key):
+                severity = metrics[key][0]["cvssData"]["baseSeverity"]
+                break
+        else:
+            if metrics.get("cvssMetricV2"):
+                severity = metrics["cvssMetricV2"][0]["baseSeverity"]
+        
+        description = next(
+            (d["value"] for d in cve.get("descriptions", []) if d.get("lang") == "en"),
+            ""
+        )
+        vulnerabilities.append({
+            "package": dep["name"].lower(),
+            "version": dep["version"],
+            "ecosystem": dep["ecosystem"],
+            "cve_id": cve.get("id", ""),
+            "severity": severity,
+            "description": description
+        })
     return vulnerabilities
 
 
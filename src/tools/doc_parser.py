@@ -1,16 +1,73 @@
 """Documentation analysis tool for identifying documentation gaps."""
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import AbstractSet, Dict, Iterator, List, Any, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import ast
+import atexit
+import functools
+import hashlib
+import multiprocessing
+import os
+import re
+import shutil
+import threading
+import time
 from datetime import datetime
+from src import config
+from src.utils.serialization import dumps_compact, loads
 
+# Parsing is CPU-bound, so larger repositories are fanned out to processes
+_PARALLEL_MIN_FILES = 32
+_PARALLEL_CHUNKSIZE = 16
 
-def analyze_documentation(repo_path: str) -> Dict[str, Any]:
+# Worker pool shared by every analysis in the process, created on first use.
+# The pool starts from threads of an already multi-threaded process, so workers
+# come from a forkserver (or spawn) rather than forking the caller.
+_POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+_global_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Any def or class, at any indentation; modules without one skip ast.parse
+_DEF_RE = re.compile(r'^[ \t]*(?:async[ \t]+)?(?:def|class)[ \t]', re.MULTILINE)
+# A string literal as the first statement, after blank and comment lines
+_MODULE_DOCSTRING_RE = re.compile(
+    r'\A(?:[ \t\f]*(?:#[^\r\n]*)?\r?\n)*[ \t\f]*[rRuU]?(?:"""|\'\'\'|"|\')'
+)
+
+# Statement fields that hold nested blocks (if/for/while/with/try/def/class)
+_BLOCK_FIELDS = ("body", "orelse", "finalbody")
+
+# Directory names never descended into: environments, VCS metadata and build output
+_EXCLUDED_DIRS = frozenset({
+    "venv", "env", ".venv", ".git", "__pycache__", "node_modules",
+    "build", "dist", ".tox", ".mypy_cache", ".pytest_cache"
+})
+
+# Per-file results cached by content hash; bump the version when counting changes.
+# Entries expire after the TTL and are swept, with older versions, once per process.
+_CACHE_VERSION = 1
+_CACHE_DIR = config.CACHE_DIR / "doc_parser" / f"v{_CACHE_VERSION}"
+_CACHE_TTL = 30 * 24 * 3600  # seconds
+_CACHE_VERSION_RE = re.compile(r'v\d+')
+_pruned_cache_dirs: Set[Path] = set()
+
+
+def analyze_documentation(
+    repo_path: str,
+    *,
+    _scandir=os.scandir,
+    _open=open
+) -> Dict[str, Any]:
     """
     Analyze repository documentation coverage and quality.
     
     Args:
         repo_path: Path to the repository
+        _scandir: scandir replacement, so tests can supply an in-memory tree
+        _open: open replacement used to read Python files
         
     Returns:
         Dictionary containing documentation analysis results
@@ -24,14 +81,10 @@ def analyze_documentation(repo_path: str) -> Dict[str, Any]:
             for name in ["README.md", "README.rst", "README.txt", "README"]
         ])
         
-        # Find Python files
-        python_files = list(repo_path.rglob("*.py"))
-        
-        # Filter out venv and other excluded directories
-        excluded_dirs = {"venv", "env", ".git", "__pycache__", "node_modules"}
+        # Find Python files, skipping venv and other excluded directories
         python_files = [
-            f for f in python_files
-            if not any(excluded in f.parts for excluded in excluded_dirs)
+            entry.path
+            for entry in _iter_python_files(str(repo_path), _EXCLUDED_DIRS, _scandir)
         ]
         
         if not python_files:
@@ -44,36 +97,58 @@ def analyze_documentation(repo_path: str) -> Dict[str, Any]:
                 "analysis_status": "no_python_files_found"
             }
         
-        # Analyze each Python file
-        file_analyses = []
-        for py_file in python_files:
-            analysis = _analyze_python_file(py_file)
-            file_analyses.append(analysis)
-        
-        # Calculate statistics
-        documented_files = [f for f in file_analyses if f["has_docstring"]]
-        undocumented_files = [
-            {
-                "file": str(f["file"].relative_to(repo_path)),
-                "functions": f["total_functions"],
-                "classes": f["total_classes"]
-            }
-            for f in file_analyses
-            if not f["has_docstring"] and (f["total_functions"] > 0 or f["total_classes"] > 0)
-        ]
+        # An injected opener never touches the on-disk cache
+        cache_dir = _CACHE_DIR if config.DOC_PARSER_CACHE and _open is open else None
+        if cache_dir is not None:
+            _prune_cache(cache_dir)
+        analyze = functools.partial(_analyze_python_file, cache_dir=cache_dir, _open=_open)
         
-        # Calculate coverage percentage
-        if python_files:
-            coverage = len(documented_files) / len(python_files)
+        # Analyze each Python file; an injected opener may not pickle, so it runs serially
+        if (
+            _open is open
+            and len(python_files) > _PARALLEL_MIN_FILES
+            and (os.cpu_count() or 1) > 1
+        ):
+            pool = _get_pool()
+            try:
+                file_analyses = list(pool.map(
+                    analyze, python_files, chunksize=_PARALLEL_CHUNKSIZE
+                ))
+            except BrokenProcessPool:
+                # A worker died (or could not import an unguarded __main__);
+                # drop the pool so the next call starts a fresh one
+                _discard_pool(pool)
+                file_analyses = [analyze(py_file) for py_file in python_files]
         else:
-            coverage = 0.0
+            file_analyses = [analyze(py_file) for py_file in python_files]
         
-        # Calculate function/class documentation
-        total_functions = sum(f["total_functions"] for f in file_analyses)
-        documented_functions = sum(f["documented_functions"] for f in file_analyses)
-        total_classes = sum(f["total_classes"] for f in file_analyses)
-        documented_classes = sum(f["documented_classes"] for f in file_analyses)
+        # Calculate statistics in a single pass; walked paths all start with
+        # the repo prefix, and only the first 10 undocumented files are reported
+        prefix_len = len(os.path.join(str(repo_path), ""))
+        documented_files = 0
+        undocumented_files = []
+        total_functions = documented_functions = 0
+        total_classes = documented_classes = 0
+        for f in file_analyses:
+            functions = f["total_functions"]
+            classes = f["total_classes"]
+            total_functions += functions
+            documented_functions += f["documented_functions"]
+            total_classes += classes
+            documented_classes += f["documented_classes"]
+            if f["has_docstring"]:
+                documented_files += 1
+            elif (functions > 0 or classes > 0) and len(undocumented_files) < 10:
+                undocumented_files.append({
+                    "file": f["file"][prefix_len:],
+                    "functions": functions,
+                    "classes": classes
+                })
+        
+        # Calculate coverage percentage
+        coverage = documented_files / len(python_files)
         
+        # Calculate function/class documentation
         function_coverage = (
             documented_functions / total_functions if total_functions > 0 else 1.0
         )
@@ -85,8 +160,8 @@ def analyze_documentation(repo_path: str) -> Dict[str, Any]:
             "coverage": round(coverage, 2),
             "has_readme": readme_exists,
             "total_files": len(python_files),
-            "documented_files": len(documented_files),
-            "undocumented_files": undocumented_files[:10],  # Top 10
+            "documented_files": documented_files,
+            "undocumented_files": undocumented_files,  # Top 10
             "function_coverage": round(function_coverage, 2),
             "class_coverage": round(class_coverage, 2),
             "total_functions": total_functions,
@@ -105,34 +180,93 @@ def analyze_documentation(repo_path: str) -> Dict[str, Any]:
         }
 
 
-def _analyze_python_file(file_path: Path) -> Dict[str, Any]:
-    """Analyze a single Python file for documentation."""
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared worker pool, starting it on first use.
+    
+    Returns:
+        Process pool reused across analyses and shut down at exit
+    """
+    global _global_pool
+    with _pool_lock:
+        if _global_pool is None:
+            _global_pool = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context(_POOL_START_METHOD)
+            )
+            atexit.register(_global_pool.shutdown)
+        return _global_pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Forget a broken pool so the next analysis starts a new one."""
+    global _global_pool
+    with _pool_lock:
+        if _global_pool is pool:
+            _global_pool = None
+    pool.shutdown(wait=False)
+
+
+def _iter_python_files(
+    path: str,
+    excluded_dirs: AbstractSet[str],
+    _scandir=os.scandir
+) -> Iterator[os.DirEntry]:
+    """
+    Recursively yield .py files, pruning excluded directories before descending.
+    
+    Files in a directory come before those in its subdirectories, and
+    directory symlinks are not followed.
+    
+    Args:
+        path: Directory to walk
+        excluded_dirs: Directory names to skip entirely
+        _scandir: scandir replacement returning DirEntry-like objects
+        
+    Yields:
+        Directory entries for Python files
+    """
+    subdirs = []
+    with _scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in excluded_dirs:
+                    subdirs.append(entry.path)
+            elif entry.name.endswith(".py") and entry.is_file():
+                yield entry
+    
+    for subdir in subdirs:
+        yield from _iter_python_files(subdir, excluded_dirs, _scandir)
+
+
+def _analyze_python_file(
+    file_path: str,
+    *,
+    cache_dir: Optional[Path] = None,
+    _open=open
+) -> Dict[str, Any]:
+    """
+    Analyze a single Python file for documentation; returns a picklable dict.
+    
+    The cache directory is passed in rather than read from the module, so
+    worker processes use the same cache (or none) as the caller.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with _open(file_path, 'rb') as f:
             content = f.read()
         
-        # Parse the AST
-        tree = ast.parse(content)
+        if cache_dir is None:
+            counts = _count_documentation(content.decode('utf-8'))
+            return {"file": file_path, **counts}
         
-        # Check for module docstring
-        has_module_docstring = ast.get_docstring(tree) is not None
+        # Unchanged files are served from the cache without parsing
+        digest = hashlib.sha256(content).hexdigest()
+        cache_path = cache_dir / digest[:2] / f"{digest}.json"
+        counts = _read_cache(cache_path)
+        if counts is None:
+            counts = _count_documentation(content.decode('utf-8'))
+            _write_cache(cache_path, counts)
         
-        # Count functions and their docstrings
-        functions = [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
-        documented_functions = sum(1 for f in functions if ast.get_docstring(f) is not None)
-        
-        # Count classes and their docstrings
-        classes = [node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
-        documented_classes = sum(1 for c in classes if ast.get_docstring(c) is not None)
-        
-        return {
-            "file": file_path,
-            "has_docstring": has_module_docstring,
-            "total_functions": len(functions),
-            "documented_functions": documented_functions,
-            "total_classes": len(classes),
-            "documented_classes": documented_classes
-        }
+        return {"file": file_path, **counts}
         
     except Exception:
         return {
@@ -145,6 +279,120 @@ def _analyze_python_file(file_path: Path) -> Dict[str, Any]:
         }
 
 
+def _count_documentation(source: str) -> Dict[str, Any]:
+    """Count a module's functions and classes and which of them have docstrings."""
+    if not _DEF_RE.search(source):
+        return {
+            "has_docstring": bool(_MODULE_DOCSTRING_RE.match(source)),
+            "total_functions": 0,
+            "documented_functions": 0,
+            "total_classes": 0,
+            "documented_classes": 0
+        }
+    
+    # Parse the AST
+    tree = ast.parse(source)
+    
+    # Count functions, classes and their docstrings. Definitions are always
+    # statements, so only statement blocks are visited, never expressions.
+    total_functions = documented_functions = 0
+    total_classes = documented_classes = 0
+    blocks = [tree.body]
+    while blocks:
+        for node in blocks.pop():
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                total_functions += 1
+                documented_functions += _has_docstring(node)
+            elif isinstance(node, ast.ClassDef):
+                total_classes += 1
+                documented_classes += _has_docstring(node)
+            
+            for field in _BLOCK_FIELDS:
+                block = getattr(node, field, None)
+                if block:
+                    blocks.append(block)
+            for clause in getattr(node, "handlers", ()) or getattr(node, "cases", ()):
+                blocks.append(clause.body)
+    
+    return {
+        "has_docstring": _has_docstring(tree),
+        "total_functions": total_functions,
+        "documented_functions": documented_functions,
+        "total_classes": total_classes,
+        "documented_classes": documented_classes
+    }
+
+
+def _read_cache(cache_path: Path) -> Optional[Dict[str, Any]]:
+    """Load cached counts, or None if missing, expired or unreadable."""
+    try:
+        with open(cache_path, 'rb') as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime > _CACHE_TTL:
+                return None
+            return loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path: Path, counts: Dict[str, Any]):
+    """Atomically store counts in the cache."""
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps_compact(counts))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Caching is best-effort; the analysis itself succeeded
+        pass
+
+
+def _prune_cache(cache_dir: Path):
+    """
+    Delete expired entries and older cache versions, once per process.
+    
+    Args:
+        cache_dir: Current versioned cache directory
+    """
+    if cache_dir in _pruned_cache_dirs:
+        return
+    _pruned_cache_dirs.add(cache_dir)
+    
+    try:
+        with os.scandir(cache_dir.parent) as versions:
+            for entry in versions:
+                if (
+                    entry.name != cache_dir.name
+                    and _CACHE_VERSION_RE.fullmatch(entry.name)
+                    and entry.is_dir(follow_symlinks=False)
+                ):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+        
+        expired_before = time.time() - _CACHE_TTL
+        with os.scandir(cache_dir) as buckets:
+            for bucket in buckets:
+                if not bucket.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(bucket.path) as entries:
+                    for entry in entries:
+                        if entry.stat(follow_symlinks=False).st_mtime < expired_before:
+                            os.unlink(entry.path)
+    except OSError:
+        # Pruning is best-effort, like caching itself
+        pass
+
+
+def _has_docstring(node: ast.AST) -> bool:
+    """Check for a docstring like ast.get_docstring, without cleaning its text."""
+    body = node.body
+    return bool(
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    )
+
+
 if __name__ == "__main__":
     import json
     result = analyze_documentation(".")
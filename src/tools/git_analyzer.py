@@ -1,10 +1,17 @@
 """Git history analysis tool for detecting code churn and risk patterns."""
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+from collections import Counter
+from operator import itemgetter
+import functools
+import heapq
 import subprocess
 import json
 from datetime import datetime, timedelta
 
+_LOG_BUFSIZE = 1024 * 1024  # read git log output in 1 MiB chunks
+_COMMIT_MARKER = b"\x00"
+
 
 def analyze_git_history(
     repo_path: str,
@@ -33,63 +40,26 @@ def analyze_git_history(
             }
         
         # Calculate date range
-        since_date = (datetime.now() - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
-        
-        # Get commit count
-        commit_count_cmd = [
-            "git", "-C", str(repo_path),
-            "rev-list", "--count", f"--since={since_date}", "HEAD"
-        ]
-        total_commits = int(subprocess.check_output(commit_count_cmd).decode().strip() or "0")
-        
-        if total_commits == 0:
-            return {
-                "risk_score": 0,
-                "high_churn_files": [],
-                "total_commits": 0,
-                "message": "No commits in the specified time range"
-            }
+        now = datetime.now()
+        since_date = (now - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
         
-        # Get file change frequencies
-        log_cmd = [
-            "git", "-C", str(repo_path),
-            "log", f"--since={since_date}",
-            "--name-only", "--pretty=format:", "HEAD"
-        ]
-        output = subprocess.check_output(log_cmd).decode()
-        
-        # Count changes per file
-        file_changes = {}
-        for line in output.split('\n'):
-            line = line.strip()
-            if line and not line.startswith('.'):
-                file_changes[line] = file_changes.get(line, 0) + 1
-        
-        # Identify high churn files (changed more than 20% of commits)
-        churn_threshold = max(3, total_commits * 0.2)
-        high_churn_files = [
-            {"file": file, "changes": count}
-            for file, count in file_changes.items()
-            if count >= churn_threshold
-        ]
-        
-        # Sort by number of changes
-        high_churn_files.sort(key=lambda x: x["changes"], reverse=True)
-        
-        # Calculate risk score (0-100)
-        if not high_churn_files:
-            risk_score = 10
+        # Reuse the last scan while HEAD has not moved; the date is part of the
+        # key so a long-running process still rolls the window forward
+        head = _read_head(repo_path / ".git")
+        if head is None:
+            result = _scan_history(str(repo_path), since_date, lookback_days)
         else:
-            # Risk increases with number of high-churn files
-            risk_score = min(100, 30 + (len(high_churn_files) * 10))
+            result = _cached_scan(str(repo_path), head, since_date, lookback_days)
         
-        return {
-            "risk_score": risk_score,
-            "total_commits": total_commits,
-            "high_churn_files": high_churn_files[:10],  # Top 10
-            "lookback_days": lookback_days,
-            "analyzed_at": datetime.now().isoformat()
+        # Callers may mutate the result, so never hand out the cached dict
+        result = {
+            **result,
+            "high_churn_files": [dict(f) for f in result["high_churn_files"]]
         }
+        # Stamped per call, since the scan itself may come from the cache
+        if result["total_commits"]:
+            result["analyzed_at"] = now.isoformat()
+        return result
         
     except subprocess.CalledProcessError as e:
         return {
@@ -107,6 +77,133 @@ def analyze_git_history(
         }
 
 
+def _read_head(git_dir: Path) -> Optional[str]:
+    """
+    Resolve HEAD to a commit sha by reading git's files directly.
+    
+    Args:
+        git_dir: The repository's .git directory
+        
+    Returns:
+        Commit sha, or None when HEAD cannot be resolved without git itself
+    """
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return head  # detached HEAD
+        
+        ref = head[len("ref: "):]
+        ref_path = git_dir / ref
+        if ref_path.is_file():
+            return ref_path.read_text().strip()
+        
+        # Refs may only live in packed-refs after git gc
+        for line in (git_dir / "packed-refs").read_text().splitlines():
+            sha, _, name = line.partition(" ")
+            if name == ref:
+                return sha
+    except OSError:
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_scan(
+    repo_str: str,
+    head: str,
+    since_date: str,
+    lookback_days: int
+) -> Dict[str, Any]:
+    """Scan history once per (repo, HEAD, window); failures raise and are not cached."""
+    return _scan_history(repo_str, since_date, lookback_days)
+
+
+def _scan_history(repo_str: str, since_date: str, lookback_days: int) -> Dict[str, Any]:
+    """
+    Run git log and build the churn analysis.
+    
+    Args:
+        repo_str: Resolved repository path
+        since_date: First day of the window as YYYY-MM-DD
+        lookback_days: Window length, echoed in the result
+        
+    Returns:
+        Analysis results with risk score and churn data
+        
+    Raises:
+        subprocess.CalledProcessError: If git log fails
+    """
+    # Get commits and the files each changed in one pass; every commit
+    # starts with a line holding only a NUL byte
+    log_cmd = [
+        "git", "-C", repo_str,
+        "log", f"--since={since_date}",
+        "--name-only", "--pretty=format:%x00", "HEAD"
+    ]
+    
+    # Count commits and changes per file while streaming
+    with subprocess.Popen(log_cmd, stdout=subprocess.PIPE, bufsize=_LOG_BUFSIZE) as proc:
+        total_commits, file_changes = _parse_log_lines(proc.stdout)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, log_cmd)
+    
+    if total_commits == 0:
+        return {
+            "risk_score": 0,
+            "high_churn_files": [],
+            "total_commits": 0,
+            "message": "No commits in the specified time range"
+        }
+    
+    # Identify high churn files (changed more than 20% of commits)
+    churn_threshold = max(3, total_commits * 0.2)
+    high_churn = [
+        (file, count) for file, count in file_changes.items()
+        if count >= churn_threshold
+    ]
+    
+    # Keep the 10 most changed; nlargest matches a stable descending sort
+    top_churn = heapq.nlargest(10, high_churn, key=itemgetter(1))
+    high_churn_files = [
+        {"file": file.decode(), "changes": count} for file, count in top_churn
+    ]
+    
+    # Calculate risk score (0-100)
+    if not high_churn:
+        risk_score = 10
+    else:
+        # Risk increases with number of high-churn files
+        risk_score = min(100, 30 + (len(high_churn) * 10))
+    
+    return {
+        "risk_score": risk_score,
+        "total_commits": total_commits,
+        "high_churn_files": high_churn_files,  # Top 10
+        "lookback_days": lookback_days
+    }
+
+
+def _parse_log_lines(lines: Iterable[bytes]) -> Tuple[int, Counter]:
+    """
+    Count commits and per-file changes in `git log --name-only` output.
+    
+    Args:
+        lines: Log output lines, each commit starting with a NUL-only line
+        
+    Returns:
+        Tuple of (commit count, Counter of changes keyed by bytes path)
+    """
+    total_commits = 0
+    file_changes = Counter()
+    for line in lines:
+        line = line.strip()
+        if line == _COMMIT_MARKER:
+            total_commits += 1
+        elif line and not line.startswith(b'.'):
+            file_changes[line] += 1
+    return total_commits, file_changes
+
+
 # Test function
 if __name__ == "__main__":
     # Test on current directory
@@ -0,0 +1,36 @@
+"""Shared Gemini model clients for agents and evaluators."""
+import functools
+import google.generativeai as genai
+from src import config
+
+# Configure the SDK once per process; models share this global client setup
+genai.configure(api_key=config.GOOGLE_API_KEY)
+
+
+@functools.lru_cache(maxsize=None)
+def get_model(
+    model_name: str,
+    temperature: float,
+    max_tokens: int
+) -> genai.GenerativeModel:
+    """
+    Get a shared Gemini model for the given generation settings.
+
+    Agents built with the same settings reuse one client, so the SDK's
+    connection pool is shared instead of being rebuilt per instance.
+
+    Args:
+        model_name: Gemini model name
+        temperature: Sampling temperature
+        max_tokens: Maximum output tokens
+
+    Returns:
+        Configured GenerativeModel instance
+    """
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config={
+            "temperature": temperature,
+            "max_output_tokens": max_tokens,
+        }
+    )
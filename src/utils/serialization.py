@@ -0,0 +1,58 @@
+"""JSON serialization helpers that use orjson when it is available."""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_pretty(obj: Any) -> str:
+    """
+    Serialize an object to indented JSON.
+    
+    Values that are not natively JSON serializable are converted with str().
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        JSON string indented by two spaces
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+
+def dumps_compact(obj: Any) -> bytes:
+    """
+    Serialize an object to compact UTF-8 encoded JSON.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        JSON bytes without extra whitespace
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+
+def loads(data: Any) -> Any:
+    """
+    Deserialize JSON from a str or bytes.
+    
+    Args:
+        data: JSON document
+        
+    Returns:
+        Deserialized object
+        
+    Raises:
+        ValueError: If data is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
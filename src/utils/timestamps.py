@@ -0,0 +1,28 @@
+"""Timestamp helpers shared by agents and evaluators."""
+from datetime import datetime, timezone
+import time
+
+
+def utcnow_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with millisecond precision.
+    
+    Returns:
+        Timestamp such as "2025-01-01T12:00:00.000+00:00"
+    """
+    return datetime.fromtimestamp(time.time(), tz=timezone.utc).isoformat(
+        timespec="milliseconds"
+    )
+
+
+def ns_to_iso(timestamp_ns: int) -> str:
+    """
+    Convert a time.time_ns() value to a local ISO 8601 string.
+    
+    Args:
+        timestamp_ns: Nanoseconds since the epoch
+        
+    Returns:
+        Timestamp formatted like datetime.now().isoformat()
+    """
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
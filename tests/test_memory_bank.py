@@ -0,0 +1,135 @@
+"""Tests for memory bank storage and retrieval."""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory.memory_bank import MemoryBank
+
+
+def _analysis(impact_score, severity):
+    """Build minimal orchestrator results for storage."""
+    return {
+        "results": {
+            "impact_analysis": {
+                "impact_score": impact_score,
+                "severity": severity,
+                "key_risks": ["High code churn detected - potential stability issues"]
+            }
+        }
+    }
+
+
+def _populated_bank():
+    """Build a memory bank holding three analyses of two repositories."""
+    bank = MemoryBank()
+    bank.store_analysis("repo_a", _analysis(20, "low"), tags=["quick", "low"])
+    bank.store_analysis("repo_b", _analysis(80, "critical"), tags=["comprehensive", "critical"])
+    bank.store_analysis("repo_a", _analysis(60, "high"), tags=["comprehensive", "high"])
+    return bank
+
+
+def test_memory_bank_lookups():
+    """Test repository, severity and filtered searches."""
+    bank = _populated_bank()
+    
+    assert [m["metadata"]["impact_score"] for m in bank.retrieve_by_repo("repo_a")] == [20, 60]
+    assert [m["repo_path"] for m in bank.retrieve_by_severity("critical")] == ["repo_b"]
+    assert bank.retrieve_by_repo("missing") == []
+    
+    results = bank.search_memories(tags=["comprehensive"], min_impact_score=70)
+    assert [m["repo_path"] for m in results] == ["repo_b"]
+    
+    results = bank.search_memories(severity="high", tags=["comprehensive", "quick"])
+    assert [m["metadata"]["impact_score"] for m in results] == [60]
+    
+    memory_id = bank.retrieve_by_severity("high")[0]["memory_id"]
+    assert bank.retrieve_by_id(memory_id)["metadata"]["impact_score"] == 60
+    assert len({m["memory_id"] for m in bank.memories}) == 3
+    
+    bank.clear_memories()
+    assert bank.retrieve_by_repo("repo_a") == []
+
+
+def test_memory_bank_recent_first():
+    """Test recent retrieval and search return the newest memories first."""
+    bank = _populated_bank()
+    # Stores can share a clock tick; make the order explicit for the search
+    for position, memory in enumerate(bank.memories):
+        memory["timestamp_epoch"] = float(position)
+    
+    assert [m["metadata"]["impact_score"] for m in bank.retrieve_recent(limit=2)] == [60, 80]
+    assert [m["metadata"]["impact_score"] for m in bank.search_memories(limit=2)] == [60, 80]
+    assert bank.retrieve_recent(limit=0) == []
+    
+    stats = bank.get_statistics()
+    assert stats["oldest_memory"] <= stats["newest_memory"]
+
+
+def test_memory_bank_persists_as_jsonl():
+    """Test stored analyses and insights reload from the storage directory."""
+    with tempfile.TemporaryDirectory() as storage_dir:
+        storage_path = Path(storage_dir)
+        bank = MemoryBank(storage_path)
+        bank.store_analysis("repo_a", _analysis(20, "low"), tags=["quick"])
+        bank.store_analysis("repo_b", _analysis(80, "critical"), tags=["comprehensive"])
+        bank.add_insight("Critical repositories have high churn")
+        
+        lines = (storage_path / "memories.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+        
+        reloaded = MemoryBank(storage_path)
+        assert [m["repo_path"] for m in reloaded.memories] == ["repo_a", "repo_b"]
+        assert reloaded.retrieve_by_severity("critical")[0]["repo_path"] == "repo_b"
+        assert reloaded.get_patterns() == bank.get_patterns()
+        insights = reloaded.get_learned_insights()
+        assert [i["insight"] for i in insights] == ["Critical repositories have high churn"]
+        
+        memory_id = reloaded.store_analysis("repo_c", _analysis(40, "medium"))
+        assert memory_id not in {m["memory_id"] for m in bank.memories}
+        
+        # A second bank on the same directory must not reuse reloaded's IDs
+        other = MemoryBank(storage_path)
+        other_id = other.store_analysis("repo_d", _analysis(50, "medium"))
+        assert other_id != memory_id
+        ids = [m["memory_id"] for m in MemoryBank(storage_path).memories]
+        assert len(ids) == len(set(ids)) == 4
+
+
+def test_memory_bank_migrates_legacy_json_file():
+    """Test a single-file store from older versions is converted on load."""
+    with tempfile.TemporaryDirectory() as storage_dir:
+        storage_path = Path(storage_dir) / "memory_bank.json"
+        old = MemoryBank()
+        old.store_analysis("repo_a", _analysis(20, "low"))
+        old.store_analysis("repo_b", _analysis(80, "critical"))
+        storage_path.write_text(json.dumps({
+            "memories": old.memories,
+            "patterns": old.patterns,
+            "insights": [{"insight": "Legacy insight", "learned_at": "2025-01-01T00:00:00"}],
+            "saved_at": "2025-01-01T00:00:00"
+        }))
+        
+        bank = MemoryBank(storage_path)
+        
+        assert storage_path.is_dir()
+        assert (Path(storage_dir) / "memory_bank.json.legacy").is_file()
+        assert [m["repo_path"] for m in bank.memories] == ["repo_a", "repo_b"]
+        assert bank.retrieve_by_severity("critical")[0]["repo_path"] == "repo_b"
+        assert [i["insight"] for i in bank.get_learned_insights()] == ["Legacy insight"]
+        
+        bank.store_analysis("repo_c", _analysis(40, "medium"))
+        assert len(MemoryBank(storage_path).memories) == 3
+        
+        other_file = Path(storage_dir) / "notes.txt"
+        other_file.write_text("not a memory bank")
+        try:
+            MemoryBank(other_file)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("non-memory-bank file accepted")
+        assert other_file.read_text() == "not a memory bank"
@@ -28,26 +28,20 @@ async def run_multiple_analyses():
     print(f"Initial memories: {memory_bank.get_statistics()['total_memories']}")
     print(f"Initial sessions: {session_service.get_session_count()}\n")
     
-    # Run 3 analyses
-    orchestrator = TechDebtOrchestrator()
-    
-    print("Running Analysis #1...")
-    result1 = await orchestrator.analyze_repository(".", "quick")
-    print(f"  Session ID: {result1.get('session_id')}")
-    print(f"  Memory ID: {result1.get('memory_id')}")
-    print(f"  Severity: {result1['results']['impact_analysis']['severity']}\n")
-    
-    print("Running Analysis #2...")
-    result2 = await orchestrator.analyze_repository(".", "comprehensive")
-    print(f"  Session ID: {result2.get('session_id')}")
-    print(f"  Memory ID: {result2.get('memory_id')}")
-    print(f"  Severity: {result2['results']['impact_analysis']['severity']}\n")
-    
-    print("Running Analysis #3...")
-    result3 = await orchestrator.analyze_repository(".", "security-focused")
-    print(f"  Session ID: {result3.get('session_id')}")
-    print(f"  Memory ID: {result3.get('memory_id')}")
-    print(f"  Severity: {result3['results']['impact_analysis']['severity']}\n")
+    # Run 3 analyses concurrently; each analyze_repository call binds its own correlation ID
+    analysis_types = ["quick", "comprehensive", "security-focused"]
+    
+    print("Running Analyses #1-#3 concurrently...\n")
+    results = await asyncio.gather(*(
+        TechDebtOrchestrator().analyze_repository(".", analysis_type)
+        for analysis_type in analysis_types
+    ))
+    
+    for i, result in enumerate(results, 1):
+        print(f"Analysis #{i}:")
+        print(f"  Session ID: {result.get('session_id')}")
+        print(f"  Memory ID: {result.get('memory_id')}")
+        print(f"  Severity: {result['results']['impact_analysis']['severity']}\n")
     
     # Check memory bank
     print("="*70)
@@ -108,7 +102,7 @@ async def run_multiple_analyses():
     print(f"\nRecent Sessions:")
     for sess in sessions:
         print(f"  - {sess.session_id}")
-        print(f"    Created: {sess.created_at}")
+        print(f"    Created: {sess.to_dict()['created_at']}")
         print(f"    State: {sess.state}")
         print(f"    Messages: {len(sess.conversation_history)}")
     
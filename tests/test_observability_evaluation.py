@@ -5,12 +5,17 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from observability.logger import get_logger, generate_correlation_id, setup_logging
-from observability.tracer import get_tracer, trace_function
-from observability.metrics import MetricsCollector, get_global_metrics
+from observability.logger import (
+    get_logger, generate_correlation_id, setup_logging, correlation_scope, get_correlation_id
+)
+from observability import tracer as tracer_module
+from observability.tracer import get_tracer, trace_function, setup_tracing
+from observability.metrics import MetricsCollector, P2Quantile, get_global_metrics
 from evaluation.llm_judge import LLMJudge
 from evaluation.metrics import EvaluationMetrics, MetricsAggregator
+from evaluation.rate_limiter import TokenBucket
 import time
+import tempfile
 from datetime import datetime
 
 
@@ -23,6 +28,14 @@ def test_logger():
     assert correlation_id.startswith("req_")
     
     logger.info("Test log message", test_key="test_value")
+    
+    with correlation_scope(correlation_id):
+        assert get_correlation_id() == correlation_id
+        with correlation_scope() as nested_id:
+            assert get_correlation_id() == nested_id != correlation_id
+        assert get_correlation_id() == correlation_id
+    assert get_correlation_id() is None
+    
     print("✓ Logger test passed")
 
 
@@ -49,6 +62,29 @@ def test_trace_decorator():
     print("✓ Trace decorator test passed")
 
 
+def test_tracing_sampling_and_disable():
+    """Test unsampled spans skip recording and disabled tracing leaves functions bare."""
+    config = tracer_module.config
+    saved = (config.ENABLE_TRACING, config.TRACE_SAMPLE_RATIO,
+             tracer_module._tracer_provider, tracer_module._tracer)
+    try:
+        config.TRACE_SAMPLE_RATIO = 0.0
+        setup_tracing()
+        with get_tracer().start_as_current_span("unsampled") as span:
+            assert not span.is_recording()
+        
+        config.ENABLE_TRACING = False
+        
+        def plain():
+            return "bare"
+        assert trace_function("disabled")(plain) is plain
+    finally:
+        (config.ENABLE_TRACING, config.TRACE_SAMPLE_RATIO,
+         tracer_module._tracer_provider, tracer_module._tracer) = saved
+    
+    print("✓ Tracing sampling test passed")
+
+
 def test_metrics_collector():
     """Test metrics collection."""
     metrics = MetricsCollector()
@@ -61,10 +97,27 @@ def test_metrics_collector():
     assert summary["total_metrics"] == 1
     assert summary["counters"]["test_counter"] == 5
     assert "test_operation" in summary["timers"]
+    assert [m.value for m in metrics.get_metrics_by_name("test_metric")] == [42.5]
+    assert metrics.get_metrics_by_name("missing") == []
     
     print("✓ Metrics collector test passed")
 
 
+def test_p2_quantile_estimates():
+    """Test P-square quantiles are exact for few samples and close for many."""
+    small = P2Quantile(0.5)
+    for value in [3.0, 1.0, 2.0]:
+        small.add(value)
+    assert small.value() == 2.0
+    
+    p95 = P2Quantile(0.95)
+    for i in range(10000):
+        p95.add(float((i * 7919) % 10000))  # every value 0..9999, shuffled
+    assert abs(p95.value() - 9500) < 100
+    
+    print("✓ P-square quantile test passed")
+
+
 def test_evaluation_metrics():
     """Test evaluation metrics."""
     metrics = EvaluationMetrics(
@@ -108,18 +161,180 @@ def test_metrics_aggregator():
     
     summary = aggregator.get_summary()
     assert summary["total_analyses"] == 2
+    assert summary["performance_metrics"]["min_duration"] == 3.0
+    
+    aggregator.clear()
+    assert aggregator.get_summary()["total_analyses"] == 0
     
     print("✓ Metrics aggregator test passed")
 
 
+class _FakeJudgeModel:
+    """Stand-in for the Gemini judge model that counts calls."""
+    
+    def __init__(self, text="OVERALL_SCORE: 82\nCOMPLETENESS: 80\nSTRENGTHS:\n- Clear\n"):
+        self.text = text
+        self.calls = 0
+    
+    def generate_content(self, prompt):
+        self.calls += 1
+        
+        class _Response:
+            text = self.text
+        
+        return _Response()
+
+
+def test_llm_judge_caches_evaluations():
+    """Test repeated evaluations of the same analysis hit the disk cache."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        judge = LLMJudge(cache_dir=Path(cache_dir))
+        judge.model = _FakeJudgeModel()
+        
+        first = judge.evaluate_analysis({"results": {}})
+        second = judge.evaluate_analysis({"results": {}})
+        assert judge.model.calls == 1
+        assert first["overall_score"] == second["overall_score"] == 82
+        
+        judge.evaluate_analysis({"results": {}}, cache_policy="disabled")
+        assert judge.model.calls == 2
+        
+        replay = judge.evaluate_analysis(
+            {"results": {"impact_analysis": {"severity": "high"}}},
+            cache_policy="replay"
+        )
+        assert judge.model.calls == 2
+        assert "error" in replay
+        
+        # Replies without any parsable scores are not cached
+        judge.model = _FakeJudgeModel("Sorry, I cannot evaluate this.")
+        unparsed = {"results": {"impact_analysis": {"severity": "low"}}}
+        judge.evaluate_analysis(unparsed)
+        judge.evaluate_analysis(unparsed)
+        assert judge.model.calls == 2
+    
+    # The cache directory is only created once something is written
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "judge"
+        judge = LLMJudge(cache_dir=cache_dir)
+        judge.model = _FakeJudgeModel()
+        judge.evaluate_analysis({"results": {}}, cache_policy="disabled")
+        assert not cache_dir.exists()
+        judge.evaluate_analysis({"results": {}})
+        assert cache_dir.exists()
+    
+    print("✓ LLM judge cache test passed")
+
+
+def test_llm_judge_parses_response():
+    """Test scores and list sections are parsed from the judge format."""
+    judge = LLMJudge()
+    evaluation = judge._parse_evaluation_response(
+        "OVERALL_SCORE: 85\n\n"
+        "COMPLETENESS: 90\nACCURACY: 80\nACTIONABILITY: 85\nCLARITY: [n/a]\n\n"
+        "STRENGTHS:\n- Thorough\n- Precise\n\n"
+        "WEAKNESSES:\n- Terse\n\n"
+        "RECOMMENDATIONS:\n- Add examples\n"
+    )
+    
+    assert evaluation["overall_score"] == 85
+    assert evaluation["dimensions"] == {
+        "completeness": 90, "accuracy": 80, "actionability": 85
+    }
+    assert evaluation["strengths"] == ["Thorough", "Precise"]
+    assert evaluation["weaknesses"] == ["Terse"]
+    assert evaluation["recommendations"] == ["Add examples"]
+    
+    # Blank lines after a header or between items do not end the section
+    spaced = judge._parse_evaluation_response(
+        "OVERALL_SCORE: 70\n\n"
+        "STRENGTHS:\n\n- Thorough\n\n- Precise\n\n"
+        "WEAKNESSES:\n  \n- Terse\n"
+        "RECOMMENDATIONS:\n\n- Add examples"
+    )
+    assert spaced["strengths"] == ["Thorough", "Precise"]
+    assert spaced["weaknesses"] == ["Terse"]
+    assert spaced["recommendations"] == ["Add examples"]
+    
+    print("✓ LLM judge parse test passed")
+
+
+def test_llm_judge_batches_tool_evaluations():
+    """Test several tool outputs are scored with one model call."""
+    judge = LLMJudge()
+    judge.model = _FakeJudgeModel(
+        "### git\nCOMPLETENESS: 90\nOVERALL: 88\n\n"
+        "### cve\nCOMPLETENESS: 70\nOVERALL: 65\n"
+    )
+    
+    evaluations = judge.evaluate_tool_outputs({
+        "git": {"risk_score": 10},
+        "cve": {"vulnerabilities": []},
+        "doc": {"coverage": 0.5}
+    })
+    
+    assert judge.model.calls == 1
+    assert evaluations["git"]["scores"] == {"completeness": 90, "overall": 88}
+    assert evaluations["cve"]["overall_score"] == 65
+    assert evaluations["doc"]["overall_score"] == 0
+    
+    # A single tool's reply is parsed whole when it has no header
+    judge.model = _FakeJudgeModel("COMPLETENESS: 75\nACCURACY: 85\nOVERALL: 80\n")
+    single = judge.evaluate_tool_output("git", {"risk_score": 10})
+    assert single["overall_score"] == 80
+    assert single["scores"]["accuracy"] == 85
+    
+    print("✓ LLM judge batch tool evaluation test passed")
+
+
+def test_token_bucket_waits_for_refill():
+    """Test the bucket blocks once the token budget is spent."""
+    bucket = TokenBucket(rpm=600, tpm=6000)  # tokens refill at 100/s
+    
+    start = time.monotonic()
+    bucket.acquire(6000)
+    assert time.monotonic() - start < 0.05
+    
+    bucket.acquire(10)
+    assert time.monotonic() - start >= 0.09
+    
+    print("✓ Token bucket test passed")
+
+
+def test_token_bucket_zero_limit_is_unlimited():
+    """Test a zero limit disables that budget and negative limits are rejected."""
+    bucket = TokenBucket(rpm=0, tpm=0)
+    
+    start = time.monotonic()
+    for _ in range(100):
+        bucket.acquire(10**9)
+    assert time.monotonic() - start < 0.05
+    
+    try:
+        TokenBucket(rpm=-1, tpm=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("negative rpm accepted")
+    
+    print("✓ Token bucket unlimited test passed")
+
+
 if __name__ == "__main__":
     print("\nTesting Observability & Evaluation Modules...\n")
     
     test_logger()
     test_tracer()
     test_trace_decorator()
+    test_tracing_sampling_and_disable()
     test_metrics_collector()
+    test_p2_quantile_estimates()
     test_evaluation_metrics()
     test_metrics_aggregator()
+    test_llm_judge_caches_evaluations()
+    test_llm_judge_parses_response()
+    test_llm_judge_batches_tool_evaluations()
+    test_token_bucket_waits_for_refill()
+    test_token_bucket_zero_limit_is_unlimited()
     
     print("\n✓ All tests passed!\n")
\ No newline at end of file
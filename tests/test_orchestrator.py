@@ -0,0 +1,212 @@
+"""Tests for deterministic orchestrator scoring."""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.agents.orchestrator import TechDebtOrchestrator, _bounded_gather
+from src.observability.logger import get_correlation_id
+
+
+def _parallel_results(risk_score, vulnerabilities, coverage):
+    """Build a minimal parallel agent result for scoring."""
+    return {
+        "git_analysis": {"risk_score": risk_score, "high_churn_files": []},
+        "cve_analysis": {"vulnerabilities": vulnerabilities, "severity_summary": {}},
+        "documentation_analysis": {"coverage": coverage, "total_files": 1}
+    }
+
+
+def test_analyze_impact_batch_scores_each_repo():
+    """Test batch impact scoring preserves order and severity boundaries."""
+    orchestrator = TechDebtOrchestrator()
+    critical = [{"severity": "CRITICAL"}] * 3
+
+    results = orchestrator.analyze_impact_batch([
+        _parallel_results(10, [], 1.0),
+        _parallel_results(100, critical, 0.0),
+    ])
+
+    assert [r["severity"] for r in results] == ["low", "critical"]
+    assert results[0]["impact_score"] == 3.0
+    assert results[1]["impact_score"] == 80.0
+    assert "Critical security vulnerabilities found: 3" in results[1]["key_risks"]
+
+
+def test_bounded_gather_limits_concurrency():
+    """Test at most limit coroutines run at once and order is preserved."""
+    running = 0
+    peak = 0
+    
+    async def work(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return i
+    
+    results = asyncio.run(_bounded_gather((work(i) for i in range(6)), 2))
+    
+    assert results == list(range(6))
+    assert peak == 2
+
+
+def test_ai_narrative_skipped_without_debt():
+    """Test a clean repository gets a canned narrative without an LLM call."""
+    orchestrator = TechDebtOrchestrator()
+    orchestrator.model = None  # any Gemini call would fail
+    debt = orchestrator._extract_metrics(_parallel_results(5, [], 0.95))
+    
+    narrative = asyncio.run(orchestrator._ai_narrative(debt, "low"))
+    
+    assert narrative["summary"].startswith("No significant technical debt")
+    assert narrative["risks"] == []
+
+
+def test_fused_evaluation_tolerates_partial_reply():
+    """Test a fused evaluation missing fields degrades instead of raising."""
+    orchestrator = TechDebtOrchestrator()
+    
+    evaluation = orchestrator._format_fused_evaluation(
+        {"completeness": 80, "accuracy": 60, "strengths": ["Clear"]}
+    )
+    
+    assert evaluation["overall_score"] == 70
+    assert evaluation["dimension_scores"] == {"completeness": 80, "accuracy": 60}
+    assert evaluation["strengths"] == ["Clear"]
+    assert evaluation["weaknesses"] == evaluation["recommendations"] == []
+    assert orchestrator._format_fused_evaluation({})["overall_score"] == 0
+
+
+class _StreamingModel:
+    """Fake Gemini model streaming a fixed reply in two chunks."""
+    
+    def __init__(self, text):
+        self.text = text
+    
+    async def generate_content_async(self, prompt, **kwargs):
+        async def stream():
+            for part in (self.text[:2], self.text[2:]):
+                yield type("Chunk", (), {"text": part})()
+        return stream()
+
+
+def test_ai_narrative_rejects_non_object_reply():
+    """Test valid JSON that is not an object falls back without a fused evaluation."""
+    orchestrator = TechDebtOrchestrator()
+    orchestrator.model = _StreamingModel("[1, 2]")
+    debt = orchestrator._extract_metrics(_parallel_results(80, [], 0.2))
+    
+    narrative = asyncio.run(
+        orchestrator._ai_narrative(debt, "high", with_evaluation=True)
+    )
+    
+    assert narrative["summary"] == "AI analysis unavailable"
+    assert "evaluation" not in narrative
+
+
+def test_concurrent_analyses_get_own_correlation_ids(monkeypatch):
+    """Test each analysis binds a fresh correlation ID that reaches pooled tools."""
+    orchestrator = TechDebtOrchestrator()
+    
+    async def fake_analyze(repo_path, analysis_type, on_chunk, correlation_id):
+        tool_id = await orchestrator._run_in_pool(get_correlation_id)
+        return {"correlation_id": correlation_id, "tool_id": tool_id}
+    
+    monkeypatch.setattr(orchestrator, "_analyze_repository", fake_analyze)
+    
+    async def run_both():
+        return await asyncio.gather(
+            orchestrator.analyze_repository("a"), orchestrator.analyze_repository("b")
+        )
+    
+    first, second = asyncio.run(run_both())
+    orchestrator.close()
+    
+    assert first["correlation_id"] != second["correlation_id"]
+    assert first["tool_id"] == first["correlation_id"]
+    assert second["tool_id"] == second["correlation_id"]
+
+
+def test_streaming_final_result_matches_streamed_text(monkeypatch):
+    """Test the final patch carries exactly the text the append patches built."""
+    orchestrator = TechDebtOrchestrator()
+    
+    async def fake_analyze(repo_path, analysis_type, on_chunk, correlation_id):
+        for part in ('{"summary": ', '"ok"}'):
+            on_chunk(part)
+            await asyncio.sleep(0)
+        return {"results": {"impact_analysis": {"ai_analysis": {"summary": "ok"}}}}
+    
+    monkeypatch.setattr(orchestrator, "_analyze_repository", fake_analyze)
+    
+    async def collect():
+        return [p async for p in orchestrator.analyze_repository_streaming("a")]
+    
+    *appends, final = asyncio.run(collect())
+    
+    assert {p["path"] for p in appends} == {"results.impact_analysis.ai_analysis_text"}
+    impact = final["value"]["results"]["impact_analysis"]
+    assert impact["ai_analysis_text"] == "".join(p["append"] for p in appends)
+    assert impact["ai_analysis"] == {"summary": "ok"}
+
+
+def test_tool_failure_reports_underlying_error(monkeypatch):
+    """Test a failing tool's message reaches the error result, not the group wrapper."""
+    orchestrator = TechDebtOrchestrator()
+    
+    def broken_scan(repo_path, api_key):
+        raise RuntimeError("manifest unreadable")
+    
+    monkeypatch.setattr(
+        "src.agents.orchestrator.scan_dependencies_for_cves", broken_scan
+    )
+    
+    result = asyncio.run(orchestrator.analyze_repository(str(Path(__file__).parent)))
+    orchestrator.close()
+    
+    assert result["status"] == "error"
+    assert result["error"] == "manifest unreadable"
+
+
+def test_report_failure_reports_underlying_error(monkeypatch):
+    """Test a failure in the report/evaluation phase is unwrapped from its task group."""
+    orchestrator = TechDebtOrchestrator()
+    
+    async def broken_report(*args):
+        raise ValueError("template missing")
+    
+    monkeypatch.setattr(orchestrator, "_generate_report", broken_report)
+    monkeypatch.setattr(
+        "src.agents.orchestrator.config.FUSE_IMPACT_AND_JUDGE", True
+    )
+    monkeypatch.setattr(
+        "src.agents.orchestrator.config.SKIP_LLM_ON_LOW", True
+    )
+    
+    result = asyncio.run(orchestrator.analyze_repository(str(Path(__file__).parent)))
+    orchestrator.close()
+    
+    assert result["status"] == "error"
+    assert result["error"] == "template missing"
+
+
+def test_io_pool_created_on_demand_and_released_on_close():
+    """Test the tool pool starts on first use, and close() stops its workers."""
+    orchestrator = TechDebtOrchestrator()
+    assert orchestrator._io_pool is None
+    
+    asyncio.run(orchestrator._run_in_pool(int))
+    workers = list(orchestrator._io_pool._threads)
+    orchestrator.close()
+    for worker in workers:
+        worker.join(timeout=5)
+    
+    assert orchestrator._io_pool is None
+    assert not any(worker.is_alive() for worker in workers)
+    # A closed orchestrator can still run tools on a fresh pool
+    assert asyncio.run(orchestrator._run_in_pool(int, "7")) == 7
+    orchestrator.close()
@@ -0,0 +1,56 @@
+"""Tests for in-memory session recency tracking."""
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.sessions.session_service import InMemorySessionService
+
+
+def test_sessions_listed_and_evicted_by_update_recency():
+    """Test updates reorder sessions and the least recently updated is evicted."""
+    service = InMemorySessionService(max_sessions=3)
+    first = service.create_session()
+    second = service.create_session()
+    third = service.create_session()
+
+    first.add_message("system", "still running")
+    service.update_session(second.session_id, state_updates={"phase": "done"})
+
+    listed = service.list_sessions()
+    assert [s.session_id for s in listed] == [
+        second.session_id, first.session_id, third.session_id
+    ]
+    assert [s.session_id for s in service.list_sessions(limit=1, offset=1)] == [first.session_id]
+
+    fourth = service.create_session()
+
+    assert service.get_session(third.session_id) is None
+    assert service.get_session_count() == 3
+    assert service.list_sessions()[0] is fourth
+
+
+def test_statistics_track_messages_and_removals():
+    """Test running statistics follow messages, deletes and evictions."""
+    service = InMemorySessionService(max_sessions=2)
+    first = service.create_session()
+    second = service.create_session()
+    first.add_message("user", "a")
+    first.add_message("assistant", "b")
+    second.add_message("user", "c")
+
+    stats = service.get_statistics()
+    assert stats["average_conversation_length"] == 1.5
+    assert stats["oldest_session"] == first.to_dict()["created_at"]
+    assert stats["newest_session"] == second.to_dict()["created_at"]
+
+    assert service.delete_session(first.session_id)
+    first.add_message("user", "ignored after deletion")
+    third = service.create_session()
+    service.create_session()  # evicts second
+
+    stats = service.get_statistics()
+    assert stats["total_sessions"] == 2
+    assert stats["average_conversation_length"] == 0
+    assert stats["oldest_session"] == third.to_dict()["created_at"]
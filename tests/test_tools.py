@@ -1,16 +1,30 @@
 """Basic tests for custom tools."""
 import pytest
+import requests
+from contextlib import nullcontext
+from io import BytesIO
 from pathlib import Path
+import os
+import posixpath
 import sys
+import time
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from tools.git_analyzer import analyze_git_history
+from tools import git_analyzer
+from tools.git_analyzer import analyze_git_history, _parse_log_lines
+from tools import cve_scanner, doc_parser
 from tools.cve_scanner import scan_dependencies_for_cves
 from tools.doc_parser import analyze_documentation
 
 
+@pytest.fixture(autouse=True)
+def _isolated_doc_cache(tmp_path, monkeypatch):
+    """Keep documentation counts out of the developer's real cache directory."""
+    monkeypatch.setattr(doc_parser, "_CACHE_DIR", tmp_path / "doc_cache" / "v1")
+
+
 def test_git_analyzer_returns_structure():
     """Test that git analyzer returns expected data structure."""
     result = analyze_git_history(".", lookback_days=30)
@@ -42,6 +56,24 @@ def test_doc_parser_returns_structure():
     assert 0 <= result["coverage"] <= 1
 
 
+def test_git_analyzer_reuses_scan_until_head_moves(monkeypatch):
+    """Test repeat calls hit the cache and hand out independent copies."""
+    git_analyzer._cached_scan.cache_clear()
+    first = analyze_git_history(".", lookback_days=30)
+    first["high_churn_files"].append({"file": "mutated", "changes": 0})
+    second = analyze_git_history(".", lookback_days=30)
+    
+    assert git_analyzer._cached_scan.cache_info().hits == 1
+    assert {"file": "mutated", "changes": 0} not in second["high_churn_files"]
+    if second["total_commits"]:
+        assert second["analyzed_at"] > first["analyzed_at"]
+        assert "analyzed_at" not in git_analyzer._scan_history(".", "2000-01-01", 30)
+    
+    monkeypatch.setattr(git_analyzer, "_read_head", lambda git_dir: "0" * 40)
+    analyze_git_history(".", lookback_days=30)
+    assert git_analyzer._cached_scan.cache_info().misses == 2
+
+
 def test_git_analyzer_nonexistent_repo():
     """Test git analyzer handles non-existent repos gracefully."""
     result = analyze_git_history("/nonexistent/path")
@@ -55,3 +87,221 @@ def test_cve_scanner_empty_dependencies():
     
     assert result["total_dependencies"] == 0
     assert result["scan_status"] == "no_dependency_files_found"
+
+
+def test_cve_scanner_nvd_lookups_keep_dependency_order(monkeypatch):
+    """Test parallel NVD lookups report findings in dependency order."""
+    def fake_fetch(session, name, version, headers):
+        if name == "broken":
+            raise RuntimeError("lookup failed")
+        return {"vulnerabilities": [{"cve": {
+            "id": f"CVE-{name}",
+            "descriptions": [{"lang": "en", "value": "demo"}],
+            "metrics": {"cvssMetricV31": [{"cvssData": {"baseSeverity": "HIGH"}}]}
+        }}]}
+    
+    paced = []
+    monkeypatch.setattr(cve_scanner, "_fetch_nvd", fake_fetch)
+    monkeypatch.setattr(cve_scanner._NVD_RATE, "acquire", lambda: paced.append(1))
+    cve_scanner._lookup_nvd.cache_clear()
+    dependencies = [
+        {"name": name, "version": "1.0", "ecosystem": "pypi"}
+        for name in ["alpha", "broken", "beta", "gamma"]
+    ]
+    
+    vulnerabilities, failed_lookups = cve_scanner._check_vulnerabilities(dependencies, "key")
+    
+    assert [v["cve_id"] for v in vulnerabilities] == ["CVE-alpha", "CVE-beta", "CVE-gamma"]
+    assert failed_lookups == ["broken==1.0"]
+    assert all(v["severity"] == "HIGH" for v in vulnerabilities)
+    
+    # Repeat scans reuse successful lookups and retry failed ones
+    cve_scanner._check_vulnerabilities(dependencies, "key")
+    cache = cve_scanner._lookup_nvd.cache_info()
+    assert (cache.hits, cache.misses) == (3, 5)
+    assert len(paced) == 5  # every NVD request went through the rate limiter
+
+
+def test_cve_scanner_nvd_retries_are_paced(monkeypatch):
+    """Test throttled NVD responses are retried through the rate limiter."""
+    responses = iter([503, 429, 200])
+    
+    def fake_fetch(session, name, version, headers):
+        status = next(responses)
+        if status != 200:
+            response = requests.Response()
+            response.status_code = status
+            raise requests.HTTPError(response=response)
+        return {"vulnerabilities": []}
+    
+    paced = []
+    monkeypatch.setattr(cve_scanner, "_fetch_nvd", fake_fetch)
+    monkeypatch.setattr(cve_scanner, "_NVD_BACKOFF", 0)
+    monkeypatch.setattr(cve_scanner._NVD_RATE, "acquire", lambda: paced.append(1))
+    cve_scanner._lookup_nvd.cache_clear()
+    
+    assert cve_scanner._lookup_nvd("alpha", "1.0", "pypi", "key") == ()
+    assert len(paced) == 3
+
+
+def test_cve_scanner_nvd_lookups_stop_at_deadline(monkeypatch):
+    """Test lookups still running at the scan deadline are reported as failed."""
+    def fake_fetch(session, name, version, headers):
+        if name == "slow":
+            time.sleep(1)
+        return {"vulnerabilities": []}
+    
+    monkeypatch.setattr(cve_scanner, "_fetch_nvd", fake_fetch)
+    monkeypatch.setattr(cve_scanner, "_NVD_DEADLINE", 0.2)
+    monkeypatch.setattr(cve_scanner._NVD_RATE, "acquire", lambda: None)
+    cve_scanner._lookup_nvd.cache_clear()
+    dependencies = [
+        {"name": name, "version": "1.0", "ecosystem": "pypi"}
+        for name in ["fast", "slow"]
+    ]
+    
+    started = time.monotonic()
+    _, failed_lookups = cve_scanner._query_nvd(dependencies, "key")
+    
+    assert failed_lookups == ["slow==1.0"]
+    assert time.monotonic() - started < 1
+
+
+def test_doc_parser_caches_file_counts(tmp_path, monkeypatch):
+    """Test unchanged files are counted from the cache without reparsing."""
+    cache_dir = tmp_path / "cache"
+    source = tmp_path / "module.py"
+    source.write_text('"""Module."""\n\ndef documented():\n    """Doc."""\n\nclass Bare:\n    pass\n')
+    
+    first = doc_parser._analyze_python_file(str(source), cache_dir=cache_dir)
+    
+    def fail(_):
+        raise AssertionError("file was reparsed")
+    monkeypatch.setattr(doc_parser, "_count_documentation", fail)
+    second = doc_parser._analyze_python_file(str(source), cache_dir=cache_dir)
+    
+    assert first == second
+    assert (second["total_functions"], second["documented_functions"]) == (1, 1)
+    assert (second["total_classes"], second["documented_classes"]) == (1, 0)
+
+
+def test_doc_parser_prunes_expired_entries_and_old_versions(tmp_path):
+    """Test the cache sweep drops expired counts and superseded version trees."""
+    cache_dir = tmp_path / "doc_parser" / "v2"
+    fresh = cache_dir / "ab" / "fresh.json"
+    expired = cache_dir / "cd" / "expired.json"
+    old_version = tmp_path / "doc_parser" / "v1" / "ef" / "old.json"
+    for path in (fresh, expired, old_version):
+        path.parent.mkdir(parents=True)
+        path.write_text("{}")
+    stale = doc_parser.time.time() - doc_parser._CACHE_TTL - 60
+    os.utime(expired, (stale, stale))
+    
+    doc_parser._prune_cache(cache_dir)
+    
+    assert fresh.exists()
+    assert not expired.exists()
+    assert not old_version.parent.parent.exists()
+    assert doc_parser._read_cache(fresh) == {}
+
+
+def test_doc_parser_cache_can_be_disabled(tmp_path, monkeypatch):
+    """Test DOC_PARSER_CACHE=false analyzes without writing any cache files."""
+    monkeypatch.setattr(doc_parser.config, "DOC_PARSER_CACHE", False)
+    (tmp_path / "repo").mkdir()
+    (tmp_path / "repo" / "module.py").write_text("def run():\n    pass\n")
+    
+    result = analyze_documentation(str(tmp_path / "repo"))
+    
+    assert result["total_functions"] == 1
+    assert not doc_parser._CACHE_DIR.exists()
+
+
+def test_doc_parser_skips_parse_for_modules_without_definitions(monkeypatch):
+    """Test modules with no def or class are classified without ast.parse."""
+    def fail(*args, **kwargs):
+        raise AssertionError("module was parsed")
+    monkeypatch.setattr(doc_parser.ast, "parse", fail)
+    
+    with_doc = doc_parser._count_documentation('# Licensed\n\n"""Package."""\nfrom .a import b\n')
+    without_doc = doc_parser._count_documentation('from .a import b\n"""Not a docstring."""\n')
+    
+    assert with_doc["has_docstring"] and with_doc["total_functions"] == 0
+    assert not without_doc["has_docstring"]
+
+
+class _FakeEntry:
+    """Minimal DirEntry over an in-memory tree of dicts (directories) and bytes (files)."""
+    
+    def __init__(self, path, node):
+        self.path = path
+        self.name = posixpath.basename(path)
+        self._node = node
+    
+    def is_dir(self, follow_symlinks=True):
+        return isinstance(self._node, dict)
+    
+    def is_file(self, follow_symlinks=True):
+        return isinstance(self._node, bytes)
+
+
+def _fake_filesystem(root, tree):
+    """Build scandir and open replacements serving tree under root."""
+    def lookup(path):
+        node = tree
+        for part in posixpath.relpath(path, root).split("/"):
+            if part != ".":
+                node = node[part]
+        return node
+    
+    def scandir(path):
+        return nullcontext([
+            _FakeEntry(posixpath.join(path, name), node)
+            for name, node in lookup(path).items()
+        ])
+    
+    def fake_open(path, mode="r"):
+        return BytesIO(lookup(path))
+    
+    return scandir, fake_open
+
+
+def test_doc_parser_reads_injected_filesystem(monkeypatch):
+    """Test documentation analysis runs against an in-memory tree."""
+    def fail(*args, **kwargs):
+        raise AssertionError("real filesystem was used")
+    monkeypatch.setattr(doc_parser, "_read_cache", fail)
+    
+    root = str(Path("/fake-repo").resolve())
+    scandir, fake_open = _fake_filesystem(root, {
+        "pkg": {
+            "core.py": b'"""Core."""\n\ndef run():\n    """Run."""\n',
+            "util.py": b"def helper():\n    pass\n\nclass Box:\n    pass\n",
+            "notes.txt": b"not python",
+        },
+        "venv": {"skipped.py": b"def hidden():\n    pass\n"},
+        "build": {"lib": {"copied.py": b"def hidden():\n    pass\n"}},
+    })
+    
+    result = analyze_documentation(root, _scandir=scandir, _open=fake_open)
+    
+    assert result["total_files"] == 2
+    assert result["documented_files"] == 1
+    assert (result["total_functions"], result["total_classes"]) == (2, 1)
+    assert result["undocumented_files"] == [
+        {"file": str(Path("pkg", "util.py")), "functions": 1, "classes": 1}
+    ]
+
+
+def test_parse_log_lines_counts_commits_and_files():
+    """Test log parsing counts commit markers and skips dotfiles and blanks."""
+    lines = [
+        b"\x00\n", b"src/a.py\n", b".gitignore\n", b"\n",
+        b"\x00\n", b"src/a.py\n", b"README.md\n",
+        b"\x00\n",
+    ]
+    
+    total_commits, file_changes = _parse_log_lines(iter(lines))
+    
+    assert total_commits == 3
+    assert file_changes == {b"src/a.py": 2, b"README.md": 1}